@@ -0,0 +1,17 @@
+# Production server settings: PASHA_ENV=production gunicorn -c gunicorn.conf.py
+import os
+
+from src.config import web_concurrency, worker_threads
+
+wsgi_app = "src.wsgi:app"
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = web_concurrency()
+threads = worker_threads()
+# Load (and warm up) the app once in the master and fork it into the workers;
+# src/prefork.py makes sure no database connection crosses the fork
+preload_app = True
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+# Recycle workers now and then so slow leaks can't build up
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")  # e.g. "-" for stdout; off by default
@@ -0,0 +1,38 @@
+"""Project funding stats columns
+
+Revision ID: 5be7d40e91c2
+Revises: a3f1c9d2b7e4
+Create Date: 2026-10-18 11:02:17.554610
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5be7d40e91c2'
+down_revision = 'a3f1c9d2b7e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('projects', sa.Column('investment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('projects', sa.Column('investor_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('projects', sa.Column('last_invested_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_investments_project_id_user_id', 'investments', ['project_id', 'user_id'], unique=False)
+
+    # Backfill from the existing ledger (same statement as `flask rebuild-project-stats`)
+    op.execute(
+        "UPDATE projects SET "
+        "investment_count = (SELECT COUNT(*) FROM investments i WHERE i.project_id = projects.id AND i.status = 'CONFIRMED'), "
+        "investor_count = (SELECT COUNT(DISTINCT i.user_id) FROM investments i WHERE i.project_id = projects.id AND i.status = 'CONFIRMED'), "
+        "last_invested_at = (SELECT MAX(i.invested_at) FROM investments i WHERE i.project_id = projects.id AND i.status = 'CONFIRMED')"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_investments_project_id_user_id', table_name='investments')
+    op.drop_column('projects', 'last_invested_at')
+    op.drop_column('projects', 'investor_count')
+    op.drop_column('projects', 'investment_count')
@@ -0,0 +1,24 @@
+"""Index for paginated project updates
+
+Revision ID: 8d2e6f1a4c93
+Revises: 5be7d40e91c2
+Create Date: 2026-10-18 14:21:40.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e6f1a4c93'
+down_revision = '5be7d40e91c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_project_updates_project_id_created_at', 'project_updates', ['project_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_project_updates_project_id_created_at', table_name='project_updates')
@@ -0,0 +1,42 @@
+"""Project catalogue indexes for keyset pagination
+
+Revision ID: a3f1c9d2b7e4
+Revises: 339964bb0bbe
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d2b7e4'
+down_revision = '339964bb0bbe'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    funding_progress = sa.Column('funding_progress', sa.Numeric(precision=12, scale=4), sa.Computed('ROUND(1.0 * current_amount / goal_amount, 4)', persisted=True), nullable=True)
+    if op.get_bind().dialect.name == 'sqlite':
+        # SQLite can't ALTER TABLE ADD a stored generated column; copy the table instead
+        with op.batch_alter_table('projects', recreate='always') as batch_op:
+            batch_op.add_column(funding_progress)
+    else:
+        op.add_column('projects', funding_progress)
+    op.create_index('ix_projects_status_created_at', 'projects', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_projects_status_category_created_at', 'projects', ['status', 'category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_projects_status_end_date', 'projects', ['status', 'end_date', 'id'], unique=False)
+    op.create_index('ix_projects_status_funding_progress', 'projects', ['status', 'funding_progress', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_projects_status_funding_progress', table_name='projects')
+    op.drop_index('ix_projects_status_end_date', table_name='projects')
+    op.drop_index('ix_projects_status_category_created_at', table_name='projects')
+    op.drop_index('ix_projects_status_created_at', table_name='projects')
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table('projects', recreate='always') as batch_op:
+            batch_op.drop_column('funding_progress')
+    else:
+        op.drop_column('projects', 'funding_progress')
@@ -0,0 +1,43 @@
+"""Covering indexes on investments and the investments archive
+
+Revision ID: b5d19e3a7c62
+Revises: f2a84d6c9e17
+Create Date: 2026-10-18 21:40:52.118306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d19e3a7c62'
+down_revision = 'f2a84d6c9e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_investments_user_id_invested_at', 'investments', ['user_id', 'invested_at', 'project_id', 'amount', 'status'], unique=False)
+    op.create_index('ix_investments_project_id_status_user_id', 'investments', ['project_id', 'status', 'user_id', 'invested_at', 'amount'], unique=False)
+    op.create_table('investments_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'CONFIRMED', 'FAILED', name='investmentstatus'), nullable=False),
+    sa.Column('invested_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_investments_archive_user_id_invested_at', 'investments_archive', ['user_id', 'invested_at'], unique=False)
+    op.create_index('ix_investments_archive_project_id_status', 'investments_archive', ['project_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_investments_archive_project_id_status', table_name='investments_archive')
+    op.drop_index('ix_investments_archive_user_id_invested_at', table_name='investments_archive')
+    op.drop_table('investments_archive')
+    op.drop_index('ix_investments_project_id_status_user_id', table_name='investments')
+    op.drop_index('ix_investments_user_id_invested_at', table_name='investments')
@@ -0,0 +1,48 @@
+"""Full-text search index on projects
+
+Revision ID: c41f7a9e2d58
+Revises: 8d2e6f1a4c93
+Create Date: 2026-10-18 16:02:11.540382
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f7a9e2d58'
+down_revision = '8d2e6f1a4c93'
+branch_labels = None
+depends_on = None
+
+# SQLite keeps an FTS5 table in sync with triggers, same as PROJECTS_FTS_DDL in src/models.py
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5("
+    "title, description, category, content='projects', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN "
+    "INSERT INTO projects_fts(rowid, title, description, category) VALUES (new.id, new.title, new.description, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN "
+    "INSERT INTO projects_fts(projects_fts, rowid, title, description, category) VALUES ('delete', old.id, old.title, old.description, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE OF title, description, category ON projects BEGIN "
+    "INSERT INTO projects_fts(projects_fts, rowid, title, description, category) VALUES ('delete', old.id, old.title, old.description, old.category); "
+    "INSERT INTO projects_fts(rowid, title, description, category) VALUES (new.id, new.title, new.description, new.category); END",
+    # index the rows that already exist
+    "INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')",
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+    else:
+        op.create_index('ft_projects_search', 'projects', ['title', 'description', 'category'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('projects_fts_ai', 'projects_fts_ad', 'projects_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS projects_fts")
+    else:
+        op.drop_index('ft_projects_search', table_name='projects')
@@ -0,0 +1,33 @@
+"""Hourly and daily project funding rollups
+
+Revision ID: e7b30c5d1f84
+Revises: c41f7a9e2d58
+Create Date: 2026-10-18 17:38:52.106734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b30c5d1f84'
+down_revision = 'c41f7a9e2d58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fill it for existing investments with `flask backfill-funding-rollups`
+    op.create_table('project_funding_rollups',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.Enum('HOUR', 'DAY', name='fundingbucket'), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('investment_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('project_id', 'bucket', 'bucket_start')
+    )
+
+
+def downgrade():
+    op.drop_table('project_funding_rollups')
@@ -0,0 +1,52 @@
+"""Transactional outbox and notifications
+
+Revision ID: f2a84d6c9e17
+Revises: e7b30c5d1f84
+Create Date: 2026-10-18 19:12:07.663815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a84d6c9e17'
+down_revision = 'e7b30c5d1f84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('outbox_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbox_events_processed_at_id', 'outbox_events', ['processed_at', 'id'], unique=False)
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SENT', 'FAILED', name='notificationstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['event_id'], ['outbox_events.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id', 'user_id', name='uq_notifications_event_id_user_id')
+    )
+    op.create_index('ix_notifications_status_available_at_user_id', 'notifications', ['status', 'available_at', 'user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notifications_status_available_at_user_id', table_name='notifications')
+    op.drop_table('notifications')
+    op.drop_index('ix_outbox_events_processed_at_id', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,110 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, literal, select, union_all
+
+from . import db
+from .cache import invalidate_investors
+from .models import ArchivedInvestment, Investment, Project, ProjectStatus
+
+archive_logger = logging.getLogger("pasha.archive")
+
+projects = Project.__table__
+investments = Investment.__table__
+archive = ArchivedInvestment.__table__
+
+LEDGER_COLUMNS = ("id", "user_id", "project_id", "amount", "status", "invested_at")
+CLOSED_STATUSES = (ProjectStatus.SUCCESSFUL, ProjectStatus.FAILED, ProjectStatus.CANCELLED)
+ARCHIVE_BATCH_PROJECTS = 50
+
+def investment_history(full_history=True, where=None):
+    """The investments ledger as a subquery with the LEDGER_COLUMNS columns.
+
+    Only the hot `investments` table, or with `full_history` UNION ALL'd
+    with the archive. `where(table)` returns the filter to apply; it is
+    applied inside each branch so both sides use their own indexes.
+    """
+    tables = (investments, archive) if full_history else (investments,)
+    selects = []
+    for table in tables:
+        query = select(*(table.c[name] for name in LEDGER_COLUMNS))
+        if where is not None:
+            query = query.where(where(table))
+        selects.append(query)
+    if len(selects) == 1:
+        return selects[0].subquery("investment_history")
+    return union_all(*selects).subquery("investment_history")
+
+def _archive_batch(cutoff, batch_size):
+    """Move the investments of one batch of long-closed projects; returns (projects, investments)."""
+    # A closed project's updated_at is when it closed (or later, if it was
+    # edited since). SKIP LOCKED lets several archivers share the work.
+    project_ids = db.session.execute(
+        select(projects.c.id)
+        .where(
+            projects.c.status.in_(CLOSED_STATUSES),
+            projects.c.updated_at < cutoff,
+            select(investments.c.id).where(investments.c.project_id == projects.c.id).exists(),
+        )
+        .order_by(projects.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not project_ids:
+        return 0, 0
+
+    # Whole projects per transaction, so readers never see one half-moved
+    moving = investments.c.project_id.in_(project_ids)
+    user_ids = db.session.execute(select(investments.c.user_id).where(moving).distinct()).scalars().all()
+    db.session.execute(insert(archive).from_select(
+        [*LEDGER_COLUMNS, "archived_at"],
+        select(*(investments.c[name] for name in LEDGER_COLUMNS), literal(datetime.utcnow(), archive.c.archived_at.type)).where(moving),
+    ))
+    moved = db.session.execute(delete(investments).where(moving)).rowcount
+    db.session.commit()
+    # Their listings and summaries without ?history=full just changed
+    invalidate_investors(*user_ids)
+    return len(project_ids), moved
+
+def archive_investments(older_than=None, batch_size=ARCHIVE_BATCH_PROJECTS):
+    """Move investments of projects closed more than `older_than` ago
+    (a timedelta, default INVESTMENT_ARCHIVE_AFTER_DAYS days) to the archive.
+
+    Works through `batch_size` projects per transaction, each committed on
+    its own, so it can run next to live traffic. Archived investments stay
+    readable through investment_history(full_history=True). Returns run
+    stats: batches, projects, investments, seconds.
+    """
+    if older_than is None:
+        older_than = timedelta(days=current_app.config.get("INVESTMENT_ARCHIVE_AFTER_DAYS", 365))
+    cutoff = datetime.utcnow() - older_than
+    stats = {"batches": 0, "projects": 0, "investments": 0}
+    started = time.perf_counter()
+    while True:
+        try:
+            moved_projects, moved = _archive_batch(cutoff, batch_size)
+        except Exception:
+            db.session.rollback()
+            raise
+        if not moved_projects:
+            break
+        stats["batches"] += 1
+        stats["projects"] += moved_projects
+        stats["investments"] += moved
+        if moved_projects < batch_size:
+            break
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    archive_logger.info(
+        f"Archived {stats['investments']} investments of {stats['projects']} closed projects "
+        f"in {stats['batches']} batches, {stats['seconds']}s"
+    )
+    return stats
+
+def archive_counts():
+    """Rows in the hot table and in the archive."""
+    return {
+        "investments": db.session.execute(select(func.count()).select_from(investments)).scalar(),
+        "investments_archive": db.session.execute(select(func.count()).select_from(archive)).scalar(),
+    }
@@ -0,0 +1,9 @@
+"""ASGI entry point for the public project reads (see async_reads.py), e.g.
+
+    uvicorn src.asgi:app --workers 2
+
+Needs an asyncio driver: aiomysql for MySQL, aiosqlite for SQLite.
+"""
+from src.async_reads import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,205 @@
+import hashlib
+import logging
+import os
+import re
+import time
+from http.cookies import CookieError, SimpleCookie
+from urllib.parse import parse_qsl, urlencode
+
+from flask import Config
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.datastructures import MultiDict
+
+from .config import DevelopmentConfig, ProductionConfig, check_production_config, is_production, load_env_config
+from .database import READ_YOUR_WRITES_COOKIE, engine_options_from_env
+from .json_provider import response_body
+from .models import Project
+from .routes.projects import (
+    catalogue_query, legacy_updates_select, next_catalogue_cursor, project_dict, project_select,
+    project_stats_select, requested_fields, serialize_project_stats, serialize_update, wants_legacy_updates,
+)
+
+async_logger = logging.getLogger("pasha.async_reads")
+
+# Characters left unescaped in query strings, as url_for does
+URL_SAFE = "!$'()*,/:;?@"
+
+# Sync driver -> its asyncio counterpart, for deriving the async URI
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+def async_database_uri(uri):
+    """`uri` with its driver swapped for the asyncio one (aiomysql, aiosqlite)."""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {backend}; set ASYNC_DATABASE_URI")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def load_config(overrides=None):
+    """The same configuration create_app would use (see config.py)."""
+    config = Config(".")
+    config.from_object(ProductionConfig if is_production() else DevelopmentConfig)
+    load_env_config(config)
+    if overrides:
+        config.update(overrides)
+    if is_production():
+        check_production_config(config)
+    return config
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class AsyncReadApp:
+    """ASGI app serving the public project reads without a thread per request.
+
+    Serves GET /api/projects, /api/projects/<id> and /api/projects/<id>/stats
+    with AsyncSession over the same models, queries and serializers as the
+    Flask views, so the JSON bodies are identical; errors are JSON
+    {"message": ...} throughout. Responses carry an ETag and honour
+    If-None-Match like the Flask ones; nothing is cached server-side.
+    Reads use the replica (DATABASE_REPLICA_URL) when configured, except
+    for clients holding a fresh read-your-writes cookie.
+
+    Run it next to the Flask app (e.g. `uvicorn src.asgi:app`) and route
+    those GETs to it at the reverse proxy; everything else 404s here.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        uri = config.get("ASYNC_DATABASE_URI") or async_database_uri(config["SQLALCHEMY_DATABASE_URI"])
+        self.engine = create_async_engine(uri, **engine_options_from_env(uri))
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.replica_engine = None
+        self.replica_sessions = self.sessions
+        replica_uri = config.get("ASYNC_DATABASE_REPLICA_URI")
+        sync_replica_uri = config.get("DATABASE_REPLICA_URI") or os.environ.get("DATABASE_REPLICA_URL")
+        if not replica_uri and sync_replica_uri:
+            replica_uri = async_database_uri(sync_replica_uri)
+        if replica_uri:
+            self.replica_engine = create_async_engine(replica_uri, **engine_options_from_env(replica_uri, prefix="DB_REPLICA_"))
+            self.replica_sessions = async_sessionmaker(self.replica_engine, expire_on_commit=False)
+        self.routes = (
+            (re.compile(r"/api/health"), self.health),
+            (re.compile(r"/api/projects"), self.list_projects),
+            (re.compile(r"/api/projects/(\d+)"), self.project_details),
+            (re.compile(r"/api/projects/(\d+)/stats"), self.project_stats),
+        )
+
+    async def dispose(self):
+        await self.engine.dispose()
+        if self.replica_engine is not None:
+            await self.replica_engine.dispose()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, send):
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        args = MultiDict(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True))
+        extra_headers = {}
+        try:
+            if scope["method"] not in ("GET", "HEAD"):
+                raise HTTPError(405, "Method not allowed")
+            for pattern, handler in self.routes:
+                match = pattern.fullmatch(scope["path"])
+                if match:
+                    break
+            else:
+                raise HTTPError(404, "Not found")
+            status, payload, extra_headers = await handler(self._sessions_for(headers), args, *match.groups())
+        except HTTPError as e:
+            status, payload = e.status, {"message": e.message}
+        except Exception:
+            async_logger.exception(f"Exception on {scope['path']} [{scope['method']}]")
+            status, payload = 500, {"message": "Internal server error"}
+
+        body = response_body(payload)
+        response_headers = {
+            "content-type": "application/json",
+            "access-control-allow-origin": "*",
+            "access-control-expose-headers": "X-Next-Cursor, Link, ETag",
+            **extra_headers,
+        }
+        if status == 200:
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            response_headers["etag"] = etag
+            response_headers["cache-control"] = "no-cache"
+            if etag in (tag.strip() for tag in headers.get("if-none-match", "").split(",")):
+                status, body = 304, b""
+        response_headers["content-length"] = str(len(body))
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in response_headers.items()],
+        })
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+    def _sessions_for(self, headers):
+        # Same rule as RoutingSession: clients that just wrote read from the primary
+        if self.replica_engine is None:
+            return self.sessions
+        try:
+            cookie = SimpleCookie(headers.get("cookie", ""))
+            written_until = float(cookie[READ_YOUR_WRITES_COOKIE].value) if READ_YOUR_WRITES_COOKIE in cookie else 0
+        except (CookieError, ValueError):
+            written_until = 0
+        return self.sessions if written_until >= time.time() else self.replica_sessions
+
+    async def health(self, sessions, args):
+        return 200, {"status": "healthy"}, {}
+
+    async def list_projects(self, sessions, args):
+        try:
+            query, fields, sort, limit = catalogue_query(args)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        async with sessions() as session:
+            projects = (await session.execute(query)).all()
+        headers = {}
+        next_cursor = next_catalogue_cursor(projects, sort, limit)
+        if next_cursor:
+            headers["x-next-cursor"] = next_cursor
+            headers["link"] = f'</api/projects?{urlencode({**args.to_dict(), "cursor": next_cursor}, safe=URL_SAFE)}>; rel="next"'
+        return 200, [project_dict(p, fields) for p in projects[:limit]], headers
+
+    async def project_details(self, sessions, args, project_id):
+        try:
+            fields = requested_fields("full", args)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+        async with sessions() as session:
+            project = (await session.execute(project_select(fields, Project.id).where(Project.id == int(project_id)))).first()
+            if project is None:
+                raise HTTPError(404, "Project not found")
+            body = project_dict(project, fields)
+            if wants_legacy_updates(args):
+                body["updates"] = [serialize_update(update) for update in await session.execute(legacy_updates_select(int(project_id)))]
+        return 200, body, {}
+
+    async def project_stats(self, sessions, args, project_id):
+        async with sessions() as session:
+            row = (await session.execute(project_stats_select(int(project_id)))).first()
+        if row is None:
+            raise HTTPError(404, "Project not found")
+        return 200, serialize_project_stats(row), {}
+
+def create_asgi_app(overrides=None):
+    """AsyncReadApp configured like the Flask app, plus `overrides` (a dict)."""
+    return AsyncReadApp(load_config(overrides))
@@ -0,0 +1,265 @@
+import itertools
+import math
+import threading
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import select
+
+from . import db
+from .models import Project, ProjectStatus, Investment, User, UserRole
+from .querycount import count_queries
+from .seeding import SEED_PASSWORD
+
+# One benchmarked request. `path`/`body` may be callables taking the
+# iteration number, for write endpoints that need fresh data every time.
+# With `readers`, BACKGROUND_READERS threads keep GETting that path while
+# the scenario is measured (a write racing the reads it invalidates).
+Scenario = namedtuple("Scenario", "name endpoint method path body token expected_status readers", defaults=(None,))
+BACKGROUND_READERS = 4
+
+def percentile(sorted_values, q):
+    """q-th percentile (0-100) of an already sorted list, nearest-rank."""
+    if not sorted_values:
+        return float("nan")
+    rank = min(len(sorted_values) - 1, max(0, math.ceil(q * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+def _fixture_ids():
+    """Representative rows of a seeded database to aim the scenarios at."""
+    projects = Project.__table__
+    investments = Investment.__table__
+    users = User.__table__
+    hot_project = db.session.execute(
+        select(projects.c.id).order_by(projects.c.investment_count.desc(), projects.c.id).limit(1)
+    ).scalar()
+    # The project with the most room left keeps accepting benchmark investments
+    open_project = db.session.execute(
+        select(projects.c.id).where(projects.c.status == ProjectStatus.FUNDING)
+        .order_by((projects.c.goal_amount - projects.c.current_amount).desc(), projects.c.id).limit(1)
+    ).scalar()
+    heavy_investor = db.session.execute(
+        select(investments.c.user_id).group_by(investments.c.user_id)
+        .order_by(db.func.count().desc(), investments.c.user_id).limit(1)
+    ).scalar()
+    owner = db.session.execute(select(users.c.id).where(users.c.role == UserRole.PROJECT_OWNER).order_by(users.c.id).limit(1)).scalar()
+    admin = db.session.execute(select(users.c.id).where(users.c.role == UserRole.ADMIN).order_by(users.c.id).limit(1)).scalar()
+    username = db.session.execute(select(users.c.username).where(users.c.id == heavy_investor)).scalar()
+    if None in (hot_project, open_project, heavy_investor, owner, admin):
+        raise RuntimeError("Benchmark database is missing seed data (run seed-data first)")
+    return {
+        "hot_project": hot_project,
+        "open_project": open_project,
+        "investor": heavy_investor,
+        "investor_username": username,
+        "owner": owner,
+        "admin": admin,
+    }
+
+def build_scenarios():
+    """One scenario per API endpoint, aimed at the hottest rows of the dataset.
+
+    Must run inside an app context (it looks up ids and issues tokens).
+    """
+    ids = _fixture_ids()
+    investor = create_access_token(identity=str(ids["investor"]))
+    owner = create_access_token(identity=str(ids["owner"]))
+    admin = create_access_token(identity=str(ids["admin"]))
+    hot, open_project = ids["hot_project"], ids["open_project"]
+    run = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    end_date = (date.today() + timedelta(days=60)).isoformat()
+
+    return [
+        Scenario("health", "health.health_check", "GET", "/api/health", None, None, 200),
+        Scenario("health pool", "health.get_pool_stats", "GET", "/api/health/pool", None, None, 200),
+        Scenario("spa shell", "serve_react_app", "GET", "/", None, None, 200),
+        Scenario("projects", "projects.get_projects", "GET", "/api/projects", None, None, 200),
+        Scenario("projects by category", "projects.get_projects", "GET", "/api/projects?category=education&sort=closest_to_goal", None, None, 200),
+        Scenario("projects ending soon", "projects.get_projects", "GET", "/api/projects?sort=ending_soon&limit=50", None, None, 200),
+        Scenario("project search", "projects.search_projects", "GET", "/api/projects/search?q=community+garden", None, None, 200),
+        Scenario("project details", "projects.get_project_details", "GET", f"/api/projects/{hot}", None, None, 200),
+        Scenario("project updates", "projects.get_project_updates", "GET", f"/api/projects/{hot}/updates", None, None, 200),
+        Scenario("funding timeseries", "projects.get_funding_timeseries", "GET", f"/api/projects/{hot}/funding-timeseries?bucket=day", None, admin, 200),
+        Scenario("project stats", "projects.get_project_stats", "GET", f"/api/projects/{hot}/stats", None, None, 200),
+        # Also writes the outbox event that fans the update out to every investor
+        Scenario(
+            "post project update", "projects.post_project_update", "POST", f"/api/projects/{hot}/updates",
+            lambda i: {"update_text": f"Bench update {run}-{i}"}, admin, 201, f"/api/projects/{hot}/updates",
+        ),
+        Scenario(
+            "create project", "projects.create_project", "POST", "/api/projects",
+            lambda i: {"title": f"Bench project {run}-{i}", "description": "Benchmark", "goal_amount": "5000", "category": "community", "end_date": end_date},
+            owner, 201,
+        ),
+        Scenario("me", "auth.get_current_user", "GET", "/api/auth/me", None, investor, 200),
+        Scenario("login", "auth.login", "POST", "/api/auth/login", {"username": ids["investor_username"], "password": SEED_PASSWORD}, None, 200),
+        Scenario(
+            "register", "auth.register", "POST", "/api/auth/register",
+            lambda i: {"username": f"bench{run}-{i}", "email": f"bench{run}-{i}@example.com", "password": SEED_PASSWORD},
+            None, 201,
+        ),
+        Scenario("my investments", "investments.get_my_investments", "GET", "/api/investments/my", None, investor, 200),
+        Scenario("my investment summary", "investments.get_my_investment_summary", "GET", "/api/investments/my/summary", None, investor, 200),
+        Scenario("export my investments", "investments.export_my_investments", "GET", "/api/investments/my/export?format=csv", None, investor, 200),
+        Scenario("export project", "investments.export_project_investments", "GET", f"/api/investments/project/{hot}/export", None, admin, 200),
+        Scenario("invest", "investments.make_investment", "POST", f"/api/investments/project/{open_project}", {"amount": "1.00"}, investor, 201),
+        Scenario(
+            "investment batch", "investments.ingest_investment_batch", "POST", "/api/investments/batch",
+            {"investments": [{"user_id": ids["investor"], "project_id": open_project, "amount": "1.00"}] * 50}, admin, 200,
+        ),
+        Scenario("metrics", "metrics", "GET", "/metrics", None, None, 200),
+    ]
+
+def run_scenario(client, scenario, iterations, warmup=3, engine=None):
+    """Send `iterations` requests for one scenario and summarise them.
+
+    Latency is wall time through the full WSGI stack (test client, no
+    network); queries are the SQL statements sent to `engine` per request.
+    For scenarios with `readers` the background reads are summarised too
+    (readers_p50_ms, readers_p95_ms, readers_errors).
+    """
+    engine = engine if engine is not None else db.engine
+    headers = {"Authorization": f"Bearer {scenario.token}"} if scenario.token else {}
+    counter = itertools.count()
+
+    def send():
+        i = next(counter)
+        body = scenario.body(i) if callable(scenario.body) else scenario.body
+        response = client.open(scenario.path, method=scenario.method, json=body, headers=headers)
+        response.get_data()  # include streamed bodies in the timing
+        response.close()
+        return response
+
+    stop = threading.Event()
+    reader_latencies, reader_errors = [], []
+
+    def read():
+        reader = client.application.test_client()
+        while not stop.is_set():
+            request_started = time.perf_counter()
+            response = reader.get(scenario.readers)
+            response.get_data()
+            reader_latencies.append(time.perf_counter() - request_started)
+            reader_errors.append(response.status_code != 200)
+
+    for _ in range(warmup):
+        send()
+    readers = [threading.Thread(target=read) for _ in range(BACKGROUND_READERS if scenario.readers else 0)]
+    for reader in readers:
+        reader.start()
+    latencies, queries, errors = [], [], 0
+    started = time.perf_counter()
+    try:
+        for _ in range(iterations):
+            with count_queries(engine, this_thread_only=True) as queries_counter:
+                request_started = time.perf_counter()
+                response = send()
+                latencies.append(time.perf_counter() - request_started)
+            queries.append(queries_counter.count)
+            errors += response.status_code != scenario.expected_status
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        for reader in readers:
+            reader.join()
+    latencies.sort()
+    result = {
+        "endpoint": scenario.endpoint,
+        "requests": iterations,
+        "errors": errors,
+        "rps": round(iterations / max(elapsed, 1e-9), 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "queries_per_request": round(sum(queries) / max(len(queries), 1), 2),
+        "max_queries": max(queries, default=0),
+    }
+    if readers:
+        reader_latencies.sort()
+        result["readers_p50_ms"] = round(percentile(reader_latencies, 50) * 1000, 3)
+        result["readers_p95_ms"] = round(percentile(reader_latencies, 95) * 1000, 3)
+        result["readers_errors"] = sum(reader_errors)
+    return result
+
+def compare_to_baseline(results, baseline, latency_threshold=0.25, query_threshold=0.0, min_latency_ms=1.0):
+    """Regressions of `results` against a saved baseline, as messages.
+
+    A scenario regresses when its p95 grows by more than `latency_threshold`
+    (a fraction, with `min_latency_ms` of slack so sub-millisecond noise
+    does not fail runs), when it issues more than `query_threshold` extra
+    queries per request, or when it starts returning errors.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if previous is None:
+            continue
+        allowed_p95 = max(previous["p95_ms"] * (1 + latency_threshold), previous["p95_ms"] + min_latency_ms)
+        if result["p95_ms"] > allowed_p95:
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f}ms > {allowed_p95:.2f}ms (baseline {previous['p95_ms']:.2f}ms)")
+        if result["queries_per_request"] > previous["queries_per_request"] + query_threshold:
+            regressions.append(f"{name}: {result['queries_per_request']} queries/request (baseline {previous['queries_per_request']})")
+        if result["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: {result['errors']} unexpected responses (baseline {previous.get('errors', 0)})")
+    return regressions
+
+async def asgi_get(app, path, headers=()):
+    """GET `path` from an ASGI app in-process; returns (status, headers, body)."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+        "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    response = {"body": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {name.decode("latin-1"): value.decode("latin-1") for name, value in message["headers"]}
+        else:
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+def run_concurrent_threads(call, paths, concurrency):
+    """Request `paths` through `call(path) -> status` from `concurrency`
+    threads; returns (seconds, sorted latencies, errors)."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    def timed(path):
+        started = time.perf_counter()
+        status = call(path)
+        return status, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, paths))
+    elapsed = time.perf_counter() - started
+    return elapsed, sorted(latency for _, latency in results), sum(1 for status, _ in results if status != 200)
+
+async def run_concurrent_tasks(app, paths, concurrency):
+    """Same as run_concurrent_threads for an ASGI app, with `concurrency`
+    asyncio tasks (connections) in one event loop."""
+    import asyncio
+
+    pending = iter(paths)
+    latencies, errors = [], 0
+
+    async def connection():
+        nonlocal errors
+        for path in pending:
+            started = time.perf_counter()
+            status, _, _ = await asgi_get(app, path)
+            latencies.append(time.perf_counter() - started)
+            errors += status != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    return time.perf_counter() - started, sorted(latencies), errors
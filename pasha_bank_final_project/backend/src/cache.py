@@ -0,0 +1,222 @@
+import functools
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+from .database import wrote_recently
+
+class CacheBackend:
+    """Minimal key/value interface the response cache needs.
+
+    Values are str. A shared backend (e.g. Redis) only has to provide these
+    four operations; `incr` must be atomic across processes.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def incr(self, key):
+        raise NotImplementedError
+
+class LRUCache(CacheBackend):
+    """In-process LRU with per-entry TTL; the default backend.
+
+    Counters (`incr`) live outside the LRU: evicting a namespace version
+    would reset it and could resurrect entries stored under an old version.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._counters.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+class RedisCache(CacheBackend):
+    """Shared backend over a redis-py compatible client.
+
+    Any object with get/set(ex=)/delete/incr works, so a local stand-in
+    (fakeredis, or a Redis-protocol server on localhost) can be used in
+    development.
+    """
+
+    def __init__(self, client, prefix="pasha:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+# Response headers worth replaying from the cache (pagination cursors etc.)
+REPLAYED_HEADERS = ("Content-Type", "X-Next-Cursor", "Link")
+
+class ResponseCache:
+    """Caches public GET responses and serves ETag / If-None-Match 304s.
+
+    Entries are grouped into namespaces ("projects", "project:42"). Writers
+    call `invalidate` after committing; that bumps the namespace version
+    embedded in every cache key, so stale entries are never read again and
+    simply age out. A reader racing with a write can still store a stale
+    entry under the new version; RESPONSE_CACHE_TTL bounds how long it lives.
+
+    The memory backend is per process: an invalidation only reaches the
+    worker that made the write, the others keep serving (and 304-ing) their
+    entries for up to RESPONSE_CACHE_TTL. It's meant for a single process;
+    with several workers use redis (production refuses memory, see
+    check_production_config). Clients holding a fresh read-your-writes
+    cookie bypass the memory backend so they at least see their own writes.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RESPONSE_CACHE_BACKEND", "memory")  # memory | redis | none
+        app.config.setdefault("RESPONSE_CACHE_TTL", 60)
+        app.config.setdefault("RESPONSE_CACHE_MAX_ENTRIES", 1024)
+        app.config.setdefault("RESPONSE_CACHE_REDIS_URL", "redis://localhost:6379/0")
+        app.extensions["response_cache"] = self
+        self.backend = self._create_backend(app.config)
+
+    @staticmethod
+    def _create_backend(config):
+        kind = config["RESPONSE_CACHE_BACKEND"]
+        if kind == "memory":
+            return LRUCache(config["RESPONSE_CACHE_MAX_ENTRIES"])
+        if kind == "redis":
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package") from e
+            return RedisCache(redis.Redis.from_url(config["RESPONSE_CACHE_REDIS_URL"]))
+        if kind == "none":
+            return None
+        raise RuntimeError(f"Unknown RESPONSE_CACHE_BACKEND: {kind}")
+
+    def _versions(self, namespaces):
+        return [str(self.backend.get(f"ns:{name}") or 0) for name in namespaces]
+
+    def invalidate(self, *namespaces):
+        """Drop every cached response in the given namespaces."""
+        if self.backend is None:
+            return
+        for name in namespaces:
+            self.backend.incr(f"ns:{name}")
+
+    def cached(self, *namespaces, private=False):
+        """Cache a GET view; namespaces may use the view's URL arguments, e.g. "project:{project_id}".
+
+        A namespace can also be a callable taking the URL arguments, for
+        per-user responses (the namespace is part of the cache key). Those
+        should pass `private=True` so shared HTTP caches don't store them.
+        """
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(**kwargs):
+                if self.backend is None or request.method != "GET":
+                    return view(**kwargs)
+                # Another worker's memory cache may still hold what this client just changed
+                if isinstance(self.backend, LRUCache) and wrote_recently():
+                    return view(**kwargs)
+
+                names = [name(**kwargs) if callable(name) else name.format(**kwargs) for name in namespaces]
+                query = "&".join(sorted(f"{k}={v}" for k, v in request.args.items(multi=True)))
+                key = "resp:" + hashlib.sha1(
+                    "|".join([request.endpoint, request.path, query, *names, *self._versions(names)]).encode()
+                ).hexdigest()
+
+                entry = self.backend.get(key)
+                if entry is not None:
+                    entry = json.loads(entry)
+                    response = current_app.response_class(entry["body"], status=200, headers=entry["headers"])
+                    response.headers["X-Cache"] = "HIT"
+                else:
+                    rv = view(**kwargs)
+                    response = current_app.make_response(rv)
+                    if response.status_code != 200:
+                        return response
+                    response.set_etag(hashlib.sha1(response.get_data()).hexdigest())
+                    entry = {
+                        "body": response.get_data(as_text=True),
+                        "headers": [(h, response.headers[h]) for h in (*REPLAYED_HEADERS, "ETag") if h in response.headers],
+                    }
+                    self.backend.set(key, json.dumps(entry), current_app.config["RESPONSE_CACHE_TTL"])
+                    response.headers["X-Cache"] = "MISS"
+
+                # Clients must revalidate, which is a cheap 304 while the entry lives
+                response.headers["Cache-Control"] = "private, no-cache" if private else "no-cache"
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+response_cache = ResponseCache()
+
+def invalidate_project(project_id):
+    """Invalidate cached reads affected by a write to one project."""
+    response_cache.invalidate("projects", f"project:{project_id}")
+
+def investor_namespace(user_id):
+    """Cache namespace of responses computed from one user's investments."""
+    return f"investor:{user_id}"
+
+def invalidate_investors(*user_ids):
+    """Invalidate cached reads of these users' portfolios after they invest."""
+    response_cache.invalidate(*(investor_namespace(user_id) for user_id in user_ids))
@@ -0,0 +1,813 @@
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import click
+from flask.cli import with_appcontext
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from . import db
+from .benchmark import percentile
+
+class ScratchConfig:
+    """Config override pointing the app at an in-memory SQLite database."""
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    TESTING = True
+    # Benchmarks drive many requests from one client on purpose
+    RATE_LIMIT_ENABLED = False
+    LOAD_SHED_MAX_IN_FLIGHT = None
+
+def seed_budget_fixture(projects, updates_per_project):
+    """Insert a small catalogue so per-row lazy loads would show up in the counts."""
+    from .models import User, Project, ProjectUpdate, ProjectStatus, UserRole
+
+    owners = []
+    for i in range(max(1, projects // 10)):
+        owner = User(username=f"owner{i}", email=f"owner{i}@example.com", role=UserRole.PROJECT_OWNER)
+        owner.password_hash = "!"  # Never used to log in
+        owners.append(owner)
+    db.session.add_all(owners)
+    db.session.flush()
+
+    for i in range(projects):
+        project = Project(
+            title=f"Project {i}",
+            description="Budget check fixture",
+            category="community",
+            goal_amount=Decimal("10000.00"),
+            current_amount=Decimal("0.00"),
+            status=ProjectStatus.FUNDING,
+            owner_id=owners[i % len(owners)].id,
+        )
+        project.updates = [ProjectUpdate(update_text=f"Update {j}") for j in range(updates_per_project)]
+        db.session.add(project)
+    db.session.commit()
+
+def seed_progress_fixture(owner_id, per_ratio=6):
+    """Projects whose funding ratios don't terminate (1/3) or tie with them
+    once rounded (0.33331666), for walking the closest_to_goal pages."""
+    from .models import Project, ProjectStatus
+
+    amounts = ((Decimal("1.00"), Decimal("3.00")), (Decimal("999949.98"), Decimal("3000000.00")))
+    for i in range(per_ratio * len(amounts)):
+        current_amount, goal_amount = amounts[i % len(amounts)]
+        db.session.add(Project(
+            title=f"Progress {i}",
+            description="Pagination check fixture",
+            category="progress",
+            goal_amount=goal_amount,
+            current_amount=current_amount,
+            status=ProjectStatus.FUNDING,
+            owner_id=owner_id,
+        ))
+    db.session.commit()
+
+def walk_catalogue(client, query):
+    """Follow X-Next-Cursor from /api/projects?<query>; returns (ids, pages, error)."""
+    ids, pages, cursor = [], 0, None
+    while True:
+        path = f"/api/projects?{query}" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(path)
+        if response.status_code != 200:
+            return ids, pages, f"HTTP {response.status_code} on page {pages + 1}"
+        pages += 1
+        ids.extend(project["id"] for project in response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids, pages, None
+
+@click.command("check-query-budget")
+@click.option("--projects", default=50, show_default=True, help="Projects in the scratch catalogue.")
+@click.option("--updates-per-project", default=3, show_default=True)
+def check_query_budget_command(projects, updates_per_project):
+    """Fail if a public endpoint exceeds its SQL statement budget, or if
+    paging through the catalogue skips or repeats projects."""
+    from . import create_app
+    from .models import Project, ProjectStatus
+    from .querycount import QUERY_BUDGETS, count_queries
+
+    app = create_app(ScratchConfig)
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        seed_budget_fixture(projects, updates_per_project)
+        project_id = db.session.query(Project.id).order_by(Project.id).limit(1).scalar()
+        db.session.remove()
+
+        paths = {
+            "projects.get_projects": "/api/projects",
+            "projects.get_project_details": f"/api/projects/{project_id}",
+            "projects.get_project_updates": f"/api/projects/{project_id}/updates",
+            "projects.get_project_stats": f"/api/projects/{project_id}/stats",
+            "projects.search_projects": "/api/projects/search?q=budget+fixture",
+        }
+        client = app.test_client()
+        for endpoint, path in paths.items():
+            with count_queries(db.engine) as counter:
+                response = client.get(path)
+            budget = QUERY_BUDGETS[endpoint]
+            ok = response.status_code == 200 and counter.count <= budget
+            failures += not ok
+            click.echo(f"{'OK  ' if ok else 'FAIL'} {endpoint}: {counter.count} queries (budget {budget}), HTTP {response.status_code}")
+            if not ok:
+                for statement in counter.statements:
+                    click.echo(f"    {statement.splitlines()[0]}")
+
+        # Every page boundary falls inside a run of equal, rounded ratios
+        owner_id = db.session.query(Project.owner_id).limit(1).scalar()
+        seed_progress_fixture(owner_id)
+        funding = db.session.query(Project.id, Project.category).filter(Project.status == ProjectStatus.FUNDING).all()
+        db.session.remove()
+        walks = {
+            "sort=closest_to_goal&category=progress&limit=3": {p.id for p in funding if p.category == "progress"},
+            "sort=closest_to_goal&limit=7": {p.id for p in funding},
+        }
+        for query, expected in walks.items():
+            ids, pages, error = walk_catalogue(client, query)
+            ok = error is None and len(ids) == len(set(ids)) and set(ids) == expected
+            failures += not ok
+            click.echo(f"{'OK  ' if ok else 'FAIL'} pagination ?{query}: {len(ids)} rows in {pages} pages, "
+                       f"{len(set(ids) & expected)} of {len(expected)} expected{f', {error}' if error else ''}")
+    if failures:
+        sys.exit(1)
+
+def _scratch_file_app(database_uri=None, **config):
+    """App bound to `database_uri`, or to a fresh SQLite file when None."""
+    from . import create_app
+
+    if database_uri is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="pasha-scratch-"), "scratch.db")
+        database_uri = f"sqlite:///{path}"
+    config = type("ScratchFileConfig", (ScratchConfig,), {
+        "SQLALCHEMY_DATABASE_URI": database_uri,
+        # SQLite serialises writers; wait for the lock instead of failing
+        "SQLALCHEMY_ENGINE_OPTIONS": {"connect_args": {"timeout": 30}} if database_uri.startswith("sqlite") else {},
+        **config,
+    })
+    return create_app(config)
+
+@click.command("stress-investments")
+@click.option("--workers", "worker_counts", default="1,2,4,8", show_default=True, help="Comma-separated thread counts to run.")
+@click.option("--investments", default=400, show_default=True, help="Investments attempted per run.")
+@click.option("--database-uri", default=None, help="Database to run against (default: scratch SQLite file).")
+def stress_investments_command(worker_counts, investments, database_uri):
+    """Invest concurrently in one project and verify the ledger is exact.
+
+    The goal is set so that 90% of the attempts fit; the rest must be
+    rejected because the project has already turned SUCCESSFUL.
+    """
+    from flask_jwt_extended import create_access_token
+    from .models import User, Project, Investment, ProjectStatus, UserRole
+
+    app = _scratch_file_app(database_uri)
+    amount = Decimal("25.00")
+    expected_accepted = investments - investments // 10
+    failures = 0
+
+    with app.app_context():
+        db.create_all()
+
+    for workers in [int(w) for w in worker_counts.split(",")]:
+        with app.app_context():
+            tag = f"stress{time.time_ns()}"
+            owner = User(username=f"{tag}-owner", email=f"{tag}-owner@example.com", role=UserRole.PROJECT_OWNER)
+            investors = [User(username=f"{tag}-{i}", email=f"{tag}-{i}@example.com") for i in range(workers)]
+            for user in [owner, *investors]:
+                user.password_hash = "!"  # Never used to log in
+            db.session.add_all([owner, *investors])
+            db.session.flush()
+            project = Project(
+                title=f"Stress {tag}", description="Concurrency stress test", owner_id=owner.id,
+                goal_amount=amount * expected_accepted, current_amount=Decimal("0.00"), status=ProjectStatus.FUNDING,
+            )
+            db.session.add(project)
+            db.session.commit()
+            project_id = project.id
+            tokens = [create_access_token(identity=str(user.id)) for user in investors]
+            db.session.remove()
+
+        def invest(i):
+            client = app.test_client()
+            response = client.post(
+                f"/api/investments/project/{project_id}",
+                json={"amount": str(amount)},
+                headers={"Authorization": f"Bearer {tokens[i % workers]}"},
+            )
+            return response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            codes = list(pool.map(invest, range(investments)))
+        elapsed = time.perf_counter() - started
+
+        with app.app_context():
+            project = db.session.get(Project, project_id)
+            ledger_total = db.session.query(db.func.coalesce(db.func.sum(Investment.amount), 0)).filter(Investment.project_id == project_id).scalar()
+            ledger_rows = Investment.query.filter_by(project_id=project_id).count()
+            ok = (
+                codes.count(201) == expected_accepted == ledger_rows
+                and codes.count(400) == investments - expected_accepted
+                and project.current_amount == ledger_total == project.goal_amount
+                and project.status == ProjectStatus.SUCCESSFUL
+                and project.investment_count == ledger_rows
+                and project.investor_count == min(workers, ledger_rows)
+            )
+            failures += not ok
+            click.echo(
+                f"{'OK  ' if ok else 'FAIL'} workers={workers}: {investments / elapsed:.1f} req/s, "
+                f"accepted={codes.count(201)} rejected={codes.count(400)} errors={len(codes) - codes.count(201) - codes.count(400)}, "
+                f"current_amount={project.current_amount} ledger={ledger_total} status={project.status.value} "
+                f"investments={project.investment_count} investors={project.investor_count}"
+            )
+            db.session.remove()
+    if failures:
+        sys.exit(1)
+
+def read_records(path):
+    """Yield dict records from a .csv file (with header row) or an NDJSON file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def chunked(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+@click.command("import-investments")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--chunk-size", default=5000, show_default=True, help="Investments per transaction.")
+@click.option("--report", type=click.File("w"), default=None, help="Write per-item results as NDJSON here.")
+@with_appcontext
+def import_investments_command(path, chunk_size, report):
+    """Import a settlement file (CSV or NDJSON) of investments.
+
+    Each record needs user_id, project_id and amount; an optional reference
+    is copied into the report.
+    """
+    from .cache import invalidate_investors, invalidate_project
+    from .ledger import MAX_BATCH_SIZE, ingest_investments
+
+    chunk_size = min(chunk_size, MAX_BATCH_SIZE)
+    accepted = rejected = 0
+    started = time.perf_counter()
+    for offset, chunk in enumerate(chunked(read_records(path), chunk_size)):
+        try:
+            results, completed = ingest_investments(chunk)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        # Only reaches workers when the response cache uses a shared backend
+        accepted_items = [chunk[r["index"]] for r in results if r["status"] == "accepted"]
+        for project_id in {int(item["project_id"]) for item in accepted_items}:
+            invalidate_project(project_id)
+        invalidate_investors(*{int(item["user_id"]) for item in accepted_items})
+        for result in results:
+            result["index"] += offset * chunk_size
+            if result["status"] == "accepted":
+                accepted += 1
+            else:
+                rejected += 1
+            if report is not None:
+                report.write(json.dumps(result) + "\n")
+        click.echo(f"Processed {accepted + rejected} records ({len(completed)} projects reached their goal in this chunk)")
+    elapsed = time.perf_counter() - started
+    click.echo(f"Done: {accepted} accepted, {rejected} rejected in {elapsed:.2f}s ({(accepted + rejected) / max(elapsed, 1e-9):.0f} rows/s)")
+
+@click.command("import-users")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--chunk-size", default=2000, show_default=True, help="Users per transaction.")
+@click.option("--report", type=click.File("w"), default=None, help="Write per-record results as NDJSON here.")
+@click.option("--hash-workers", type=int, default=os.cpu_count() or 1, show_default="CPU count", help="Hashing processes (0 hashes inline).")
+@with_appcontext
+def import_users_command(path, chunk_size, report, hash_workers):
+    """Bulk-create investor accounts from a CSV or NDJSON file.
+
+    Each record needs username, email and password; full_name and role are
+    optional. Existing or repeated usernames/emails are skipped (ignoring case).
+    """
+    from .passwords import password_hasher
+    from .provisioning import provision_users
+
+    # PASSWORD_HASH_WORKERS splits the CPUs between web workers; here this is the only process
+    password_hasher.workers = hash_workers
+
+    counts = {"created": 0, "skipped": 0, "rejected": 0}
+    seen_usernames, seen_emails = set(), set()
+    started = time.perf_counter()
+    for offset, chunk in enumerate(chunked(read_records(path), chunk_size)):
+        for result in provision_users(chunk, seen_usernames, seen_emails):
+            counts[result["status"]] += 1
+            result["index"] += offset * chunk_size
+            if report is not None:
+                report.write(json.dumps(result) + "\n")
+        elapsed = time.perf_counter() - started
+        processed = sum(counts.values())
+        click.echo(f"Processed {processed} records, {counts['created']} created ({processed / max(elapsed, 1e-9):.0f} rows/s)")
+    elapsed = time.perf_counter() - started
+    click.echo(
+        f"Done: {counts['created']} created, {counts['skipped']} skipped, {counts['rejected']} rejected "
+        f"in {elapsed:.2f}s ({counts['created'] / max(elapsed, 1e-9):.0f} users/s)"
+    )
+
+@click.command("rebuild-project-stats")
+@with_appcontext
+def rebuild_project_stats_command():
+    """Recompute every project's funding stats from the investments ledger."""
+    from .ledger import rebuild_project_stats
+
+    started = time.perf_counter()
+    try:
+        updated = rebuild_project_stats()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"Rebuilt funding stats for {updated} projects in {time.perf_counter() - started:.2f}s")
+
+@click.command("backfill-funding-rollups")
+@click.option("--project-id", "project_ids", type=int, multiple=True, help="Only these projects (repeatable; default: all).")
+@with_appcontext
+def backfill_funding_rollups_command(project_ids):
+    """Rebuild the hourly/daily funding rollups from the investments ledger."""
+    from .ledger import rebuild_funding_rollups
+
+    started = time.perf_counter()
+    written = rebuild_funding_rollups(list(project_ids) or None)
+    click.echo(f"Wrote {written} rollup rows in {time.perf_counter() - started:.2f}s")
+
+@click.command("bench-login-flood")
+@click.option("--logins", default=200, show_default=True, help="Total login attempts in the flood.")
+@click.option("--login-concurrency", default=16, show_default=True)
+@click.option("--readers", default=4, show_default=True, help="Threads browsing the catalogue meanwhile.")
+@click.option("--hash-workers", type=int, default=None, help="Hashing processes (0 hashes inline; default: CPU count / WEB_CONCURRENCY).")
+@click.option("--hash-method", default=None, help="Override PASSWORD_HASH_METHOD.")
+def bench_login_flood_command(logins, login_concurrency, readers, hash_workers, hash_method):
+    """Measure login and catalogue latency while a login flood is running."""
+    from .models import User
+
+    overrides = {"RESPONSE_CACHE_BACKEND": "none"}  # measure real reads
+    if hash_workers is not None:
+        overrides["PASSWORD_HASH_WORKERS"] = hash_workers
+    if hash_method is not None:
+        overrides["PASSWORD_HASH_METHOD"] = hash_method
+    app = _scratch_file_app(**overrides)
+    with app.app_context():
+        db.create_all()
+        seed_budget_fixture(50, 2)
+        user = User(username="flood", email="flood@example.com")
+        user.set_password("correct horse battery staple")
+        db.session.add(user)
+        db.session.commit()
+        db.session.remove()
+
+    def login(_):
+        started = time.perf_counter()
+        response = app.test_client().post("/api/auth/login", json={"username": "flood", "password": "correct horse battery staple"})
+        return response.status_code, time.perf_counter() - started
+
+    def browse(stop):
+        client = app.test_client()
+        latencies = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            client.get("/api/projects")
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    def run_readers(duration=None, during=None):
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=readers) as pool:
+            futures = [pool.submit(browse, stop) for _ in range(readers)]
+            if during is not None:
+                result = during()
+            else:
+                time.sleep(duration)
+                result = None
+            stop.set()
+            latencies = sorted(l for f in futures for l in f.result())
+        return latencies, result
+
+    def flood():
+        with ThreadPoolExecutor(max_workers=login_concurrency) as pool:
+            return list(pool.map(login, range(logins)))
+
+    login(None)  # start the hashing pool outside the measurement
+    idle_reads, _ = run_readers(duration=2)
+    flood_reads, results = run_readers(during=flood)
+    login_latencies = sorted(elapsed for code, elapsed in results if code == 200)
+    rejected = sum(1 for code, _ in results if code == 503)
+
+    def summary(values):
+        return f"p50={percentile(values, 50) * 1000:.1f}ms p99={percentile(values, 99) * 1000:.1f}ms (n={len(values)})"
+
+    click.echo(
+        f"hash method={app.config['PASSWORD_HASH_METHOD']} workers={app.config['PASSWORD_HASH_WORKERS']} "
+        f"max pending={app.config['PASSWORD_HASH_MAX_PENDING']}"
+    )
+    click.echo(f"reads, idle:        {summary(idle_reads)}")
+    click.echo(f"reads, under flood: {summary(flood_reads)}")
+    click.echo(f"logins:             {summary(login_latencies)}, {rejected} shed with 503")
+
+@click.command("bench-overload")
+@click.option("--requests", "total", default=2000, show_default=True, help="Requests per run.")
+@click.option("--concurrency", default=32, show_default=True, help="Concurrent clients.")
+@click.option("--max-in-flight", "limits", type=int, multiple=True, help="LOAD_SHED_MAX_IN_FLIGHT values to compare (repeatable; 0 disables shedding).")
+@click.option("--path", default="/api/projects", show_default=True, help="Endpoint to overload.")
+def bench_overload_command(total, concurrency, limits, path):
+    """Compare latency of admitted requests with and without load shedding."""
+    click.echo(f"{'max in flight':<14} {'ok/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'shed':>6}")
+    for limit in limits or (0, max(1, concurrency // 4)):
+        app = _scratch_file_app(RESPONSE_CACHE_BACKEND="none", LOAD_SHED_MAX_IN_FLIGHT=limit or None)
+        with app.app_context():
+            db.create_all()
+            seed_budget_fixture(50, 2)
+            db.session.remove()
+
+        def call(_):
+            started = time.perf_counter()
+            response = app.test_client().get(path)
+            response.get_data()
+            return response.status_code, time.perf_counter() - started
+
+        call(None)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(call, range(total)))
+        elapsed = time.perf_counter() - started
+        admitted = sorted(latency for status, latency in results if status == 200)
+        shed = sum(1 for status, _ in results if status == 503)
+        click.echo(
+            f"{limit or 'off':<14} {len(admitted) / elapsed:>8.1f} {percentile(admitted, 50) * 1000:>8.2f} "
+            f"{percentile(admitted, 95) * 1000:>8.2f} {percentile(admitted, 99) * 1000:>8.2f} {shed:>6}"
+        )
+
+# Runs in a fresh interpreter: times `import src`, loading src.wsgi (create_app,
+# plus warm-up when preloading) and the first responses, in this process or,
+# with "fork", in a child forked from it the way gunicorn --preload does
+STARTUP_PROBE = """
+import json, os, sys, time
+path, fork = sys.argv[1], sys.argv[2] == "fork"
+started = time.perf_counter()
+import src
+imported = time.perf_counter()
+from src.wsgi import app
+ready = time.perf_counter()
+
+def serve(since):
+    client = app.test_client()
+    timings = []
+    for _ in range(2):
+        response = client.get(path)
+        response.get_data()
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+        timings.append(time.perf_counter())
+    return {"first": timings[0] - since, "second": timings[1] - timings[0]}
+
+result = {"import": imported - started, "ready": ready - started}
+if fork:
+    read_fd, write_fd = os.pipe()
+    forked = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.write(write_fd, json.dumps(serve(forked)).encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        output = pipe.read()
+    os.waitpid(pid, 0)
+    if not output:
+        sys.exit("the forked worker failed")
+    result.update(json.loads(output))
+else:
+    result.update(serve(started))
+print(json.dumps(result))
+"""
+
+@click.command("bench-startup")
+@click.option("--runs", default=5, show_default=True, help="Fresh processes started per mode.")
+@click.option("--path", default="/api/projects", show_default=True, help="Endpoint requested first.")
+@click.option("--database-uri", default=None, help="Database the probes use (default: seeded scratch SQLite file).")
+def bench_startup_command(runs, path, database_uri):
+    """Measure import time and time to first response, cold and preloaded.
+
+    "cold" is a worker that imports and creates the app itself (no
+    preload). "preload" warms the app up in a parent process and forks the
+    worker from it; its start is timed from the fork. Medians over --runs.
+    """
+    if database_uri is None:
+        app = _scratch_file_app()
+        database_uri = app.config["SQLALCHEMY_DATABASE_URI"]
+        with app.app_context():
+            db.create_all()
+            seed_budget_fixture(50, 2)
+            db.session.remove()
+            db.engine.dispose()
+
+    env = {key: value for key, value in os.environ.items() if not key.startswith("PASHA_")}
+    env.update({
+        "PASHA_SQLALCHEMY_DATABASE_URI": database_uri,
+        # Measure the real work of the second request, not a cache hit
+        "PASHA_RESPONSE_CACHE_BACKEND": "none",
+        "LOG_LEVEL": "WARNING",
+    })
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    click.echo(f"{'mode':<8} {'import ms':>10} {'ready ms':>9} {'start->1st ms':>14} {'2nd ms':>8}")
+    for mode, preload in (("cold", "false"), ("preload", "true")):
+        samples = []
+        for _ in range(runs):
+            completed = subprocess.run(
+                [sys.executable, "-c", STARTUP_PROBE, path, "fork" if preload == "true" else "inline"],
+                env={**env, "PASHA_PRELOAD_WARMUP": preload}, cwd=backend_dir, capture_output=True, text=True,
+            )
+            if completed.returncode != 0:
+                raise click.ClickException(f"{mode} probe failed:\n{completed.stderr.strip()}")
+            samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+        def median_ms(key):
+            return statistics.median(sample[key] for sample in samples) * 1000
+
+        click.echo(
+            f"{mode:<8} {median_ms('import'):>10.1f} {median_ms('ready'):>9.1f} "
+            f"{median_ms('first'):>14.1f} {median_ms('second'):>8.2f}"
+        )
+
+@click.command("bench-async-reads")
+@click.option("--requests", "total", default=2000, show_default=True, help="Requests per run.")
+@click.option("--concurrency", "concurrencies", default="1,8,32,128", show_default=True, help="Comma-separated concurrent connections to run.")
+@click.option("--database-uri", default=None, help="Database to run against (default: seeded scratch SQLite file).")
+def bench_async_reads_command(total, concurrencies, database_uri):
+    """Compare the ASGI read path (async_reads.py) with the Flask views.
+
+    Both apps are driven in-process over the same catalogue, detail and
+    stats requests: Flask from a thread per connection (as gunicorn's
+    threads would), the ASGI app from one asyncio task per connection.
+    With a local SQLite file there is little I/O to overlap; point
+    --database-uri at MySQL to see the effect of network round trips.
+    """
+    import asyncio
+    from .async_reads import create_asgi_app
+    from .benchmark import asgi_get, run_concurrent_tasks, run_concurrent_threads
+    from .models import Project
+
+    app = _scratch_file_app(database_uri, RESPONSE_CACHE_BACKEND="none")
+    with app.app_context():
+        if database_uri is None:
+            db.create_all()
+            seed_budget_fixture(200, 2)
+        project_ids = [row.id for row in db.session.query(Project.id).order_by(Project.id).limit(50)]
+        db.session.remove()
+    if not project_ids:
+        raise click.ClickException("The database has no projects")
+    templates = ("/api/projects", "/api/projects?sort=closest_to_goal&limit=50", "/api/projects/{}", "/api/projects/{}/stats")
+    paths = [templates[i % len(templates)].format(project_ids[i % len(project_ids)]) for i in range(total)]
+
+    async def run_asgi():
+        asgi_app = create_asgi_app({"SQLALCHEMY_DATABASE_URI": app.config["SQLALCHEMY_DATABASE_URI"]})
+        try:
+            # The bodies must match the Flask views' byte for byte
+            for path in set(paths[:len(templates)]):
+                _, _, body = await asgi_get(asgi_app, path)
+                if body != app.test_client().get(path).get_data():
+                    raise click.ClickException(f"ASGI and Flask responses differ for {path}")
+            return [(concurrency, await run_concurrent_tasks(asgi_app, paths, concurrency)) for concurrency in counts]
+        finally:
+            await asgi_app.dispose()
+
+    def flask_get(path):
+        response = app.test_client().get(path)
+        response.get_data()
+        return response.status_code
+
+    counts = [int(c) for c in concurrencies.split(",")]
+    results = [("flask", concurrency, run_concurrent_threads(flask_get, paths, concurrency)) for concurrency in counts]
+    results += [("asgi", concurrency, result) for concurrency, result in asyncio.run(run_asgi())]
+
+    click.echo(f"{'server':<7} {'conns':>6} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for server, concurrency, (elapsed, latencies, errors) in results:
+        click.echo(
+            f"{server:<7} {concurrency:>6} {len(latencies) / elapsed:>9.1f} {percentile(latencies, 50) * 1000:>8.2f} "
+            f"{percentile(latencies, 99) * 1000:>8.2f} {errors:>7}"
+        )
+
+@click.command("seed-data")
+@click.option("--users", default=2000, show_default=True)
+@click.option("--projects", default=500, show_default=True)
+@click.option("--investments", default=50000, show_default=True)
+@click.option("--updates-per-project", default=3, show_default=True, help="Average updates per project.")
+@click.option("--skew", default=1.1, show_default=True, help="Zipf exponent for project popularity and investor activity.")
+@click.option("--seed", default=42, show_default=True, help="Random seed (same seed, same dataset).")
+@click.option("--create-schema", is_flag=True, help="Create missing tables first (scratch databases).")
+@click.option("--database-uri", default=None, help="Database to seed instead of the app's, e.g. sqlite:///bench.db")
+@with_appcontext
+def seed_data_command(users, projects, investments, updates_per_project, skew, seed, create_schema, database_uri):
+    """Fill an empty database with a realistic synthetic dataset.
+
+    Every seeded user can log in as userN with the password in
+    src/seeding.py; user1 is an admin.
+    """
+    from flask import current_app
+    from .seeding import seed_dataset
+
+    app = _scratch_file_app(database_uri) if database_uri else current_app
+    started = time.perf_counter()
+    with app.app_context():
+        if create_schema:
+            db.create_all()
+        try:
+            counts = seed_dataset(users, projects, investments, updates_per_project, skew, seed)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+    click.echo(f"Seeded {', '.join(f'{n} {table}' for table, n in counts.items())} in {time.perf_counter() - started:.2f}s")
+
+@click.command("bench-endpoints")
+@click.option("--database-uri", default=None, help="Seeded scratch database to run against (default: new SQLite file).")
+@click.option("--users", default=2000, show_default=True, help="Dataset size when seeding a new scratch database.")
+@click.option("--projects", default=500, show_default=True)
+@click.option("--investments", default=50000, show_default=True)
+@click.option("--seed", default=42, show_default=True)
+@click.option("--iterations", default=100, show_default=True, help="Measured requests per scenario.")
+@click.option("--only", default=None, help="Comma-separated scenario names or endpoints to run.")
+@click.option("--response-cache/--no-response-cache", default=False, show_default=True, help="Measure with the response cache enabled.")
+@click.option("--save-baseline", type=click.Path(dir_okay=False), default=None, help="Write the results as a JSON baseline.")
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False), default=None, help="Compare against a JSON baseline; exit 1 on regressions.")
+@click.option("--latency-threshold", default=0.25, show_default=True, help="Allowed p95 growth over the baseline (fraction).")
+@click.option("--query-threshold", default=0.0, show_default=True, help="Allowed extra queries per request over the baseline.")
+def bench_endpoints_command(database_uri, users, projects, investments, seed, iterations, only, response_cache,
+                            save_baseline, baseline, latency_threshold, query_threshold):
+    """Benchmark every API endpoint against a seeded dataset.
+
+    Reports throughput, p50/p95/p99 latency and SQL queries per request for
+    each scenario. Write endpoints add rows, so only point --database-uri
+    at a scratch copy.
+    """
+    from .benchmark import build_scenarios, compare_to_baseline, run_scenario
+    from .models import User
+    from .seeding import seed_dataset
+
+    overrides = {} if response_cache else {"RESPONSE_CACHE_BACKEND": "none"}
+    app = _scratch_file_app(database_uri, **overrides)
+    with app.app_context():
+        db.create_all()
+        if not db.session.query(User.id).limit(1).scalar():
+            click.echo(f"Seeding {users} users, {projects} projects, {investments} investments...")
+            seed_dataset(users, projects, investments, seed=seed)
+        scenarios = build_scenarios()
+        db.session.remove()
+    if only:
+        wanted = {name.strip() for name in only.split(",")}
+        scenarios = [s for s in scenarios if s.name in wanted or s.endpoint in wanted]
+
+    results = {}
+    client = app.test_client()
+    click.echo(f"{'scenario':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>6}")
+    for scenario in scenarios:
+        with app.app_context():
+            result = results[scenario.name] = run_scenario(client, scenario, iterations)
+        click.echo(
+            f"{scenario.name:<22} {result['rps']:>8.1f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+            f"{result['p99_ms']:>8.2f} {result['queries_per_request']:>8} {result['errors']:>6}"
+        )
+        if "readers_p95_ms" in result:
+            click.echo(f"{'  with readers':<22} {'':>8} {result['readers_p50_ms']:>8.2f} {result['readers_p95_ms']:>8.2f} {'':>8} {'':>8} {result['readers_errors']:>6}")
+
+    if save_baseline:
+        with open(save_baseline, "w") as f:
+            json.dump({
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "database": app.config["SQLALCHEMY_DATABASE_URI"].split("://")[0],
+                "iterations": iterations,
+                "response_cache": response_cache,
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+        click.echo(f"Baseline written to {save_baseline}")
+    if baseline:
+        with open(baseline) as f:
+            regressions = compare_to_baseline(results, json.load(f), latency_threshold, query_threshold)
+        for message in regressions:
+            click.echo(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        click.echo("No regressions against the baseline")
+
+@click.command("sweep-projects")
+@click.option("--batch-size", default=500, show_default=True, help="Projects closed per transaction.")
+@click.option("--loop", is_flag=True, help="Keep running as a worker, sweeping every --interval seconds.")
+@click.option("--interval", default=60.0, show_default=True, help="Seconds between sweeps with --loop.")
+@click.option("--metrics-file", type=click.Path(dir_okay=False), default=None, help="Write Prometheus textfile metrics here after each sweep.")
+@with_appcontext
+def sweep_projects_command(batch_size, loop, interval, metrics_file):
+    """Close FUNDING projects past their end date (SUCCESSFUL if funded, else FAILED).
+
+    Safe to run from cron on several nodes at once: concurrent sweepers
+    skip each other's locked batches.
+    """
+    from .lifecycle import sweep_expired_projects, write_sweep_metrics
+
+    totals = {"successful": 0, "failed": 0}
+    while True:
+        stats = sweep_expired_projects(batch_size=batch_size)
+        db.session.remove()
+        totals["successful"] += stats["successful"]
+        totals["failed"] += stats["failed"]
+        if metrics_file:
+            write_sweep_metrics(metrics_file, stats, totals)
+        click.echo(
+            f"Closed {stats['processed']} projects ({stats['successful']} successful, {stats['failed']} failed) "
+            f"in {stats['batches']} batches, {stats['seconds']}s"
+        )
+        if not loop:
+            break
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            break
+
+@click.command("archive-investments")
+@click.option("--older-than-days", type=float, default=None, help="Archive projects closed longer ago than this (default: INVESTMENT_ARCHIVE_AFTER_DAYS).")
+@click.option("--batch-size", default=50, show_default=True, help="Projects whose investments are moved per transaction.")
+@with_appcontext
+def archive_investments_command(older_than_days, batch_size):
+    """Move investments of long-closed projects to investments_archive.
+
+    They stay readable with ?history=full. Safe to run from cron on several
+    nodes at once: concurrent archivers skip each other's locked batches.
+    """
+    from datetime import timedelta
+    from .archive import archive_counts, archive_investments
+
+    older_than = timedelta(days=older_than_days) if older_than_days is not None else None
+    stats = archive_investments(older_than, batch_size=batch_size)
+    counts = archive_counts()
+    db.session.remove()
+    click.echo(
+        f"Archived {stats['investments']} investments of {stats['projects']} projects in {stats['batches']} batches, "
+        f"{stats['seconds']}s ({counts['investments']} hot, {counts['investments_archive']} archived)"
+    )
+
+@click.command("notification-worker")
+@click.option("--batch-size", default=500, show_default=True, help="Notifications delivered per transaction.")
+@click.option("--loop", is_flag=True, help="Keep running, polling the outbox every --interval seconds.")
+@click.option("--interval", default=5.0, show_default=True, help="Seconds between passes with --loop.")
+@with_appcontext
+def notification_worker_command(batch_size, loop, interval):
+    """Fan outbox events out to investors and deliver them through NOTIFICATION_SINK.
+
+    Run it as its own process; several can run at once (they skip each
+    other's locked rows).
+    """
+    from flask import current_app
+    from .notifications import create_sink, process_notifications
+
+    sink = create_sink(current_app.config)
+    while True:
+        stats = process_notifications(sink, batch_size=batch_size)
+        db.session.remove()
+        if stats["events"] or stats["sent"] or stats["retried"] or stats["failed"] or not loop:
+            click.echo(
+                f"{stats['events']} events -> {stats['notifications']} notifications; "
+                f"sent {stats['sent']}, retrying {stats['retried']}, failed {stats['failed']} in {stats['seconds']}s"
+            )
+        if not loop:
+            break
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            break
+
+def register_commands(app):
+    app.cli.add_command(check_query_budget_command)
+    app.cli.add_command(stress_investments_command)
+    app.cli.add_command(import_investments_command)
+    app.cli.add_command(import_users_command)
+    app.cli.add_command(rebuild_project_stats_command)
+    app.cli.add_command(backfill_funding_rollups_command)
+    app.cli.add_command(bench_login_flood_command)
+    app.cli.add_command(bench_overload_command)
+    app.cli.add_command(bench_startup_command)
+    app.cli.add_command(bench_async_reads_command)
+    app.cli.add_command(seed_data_command)
+    app.cli.add_command(bench_endpoints_command)
+    app.cli.add_command(sweep_projects_command)
+    app.cli.add_command(archive_investments_command)
+    app.cli.add_command(notification_worker_command)
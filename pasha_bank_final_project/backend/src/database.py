@@ -0,0 +1,106 @@
+import functools
+import os
+import time
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = "replica"
+READ_YOUR_WRITES_COOKIE = "pasha_rw"
+
+def engine_options_from_env(uri, prefix="DB_"):
+    """Pool settings for `uri` from DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE and DB_POOL_PRE_PING.
+
+    SQLite keeps Flask-SQLAlchemy's defaults (its pools take no size limits).
+    """
+    if make_url(uri).get_backend_name() == "sqlite":
+        return {}
+    env = os.environ
+    return {
+        "pool_size": int(env.get(f"{prefix}POOL_SIZE", 10)),
+        "max_overflow": int(env.get(f"{prefix}MAX_OVERFLOW", 10)),
+        "pool_timeout": float(env.get(f"{prefix}POOL_TIMEOUT", 10)),
+        # Below MySQL's wait_timeout so idle connections are never dead on checkout
+        "pool_recycle": int(env.get(f"{prefix}POOL_RECYCLE", 1800)),
+        "pool_pre_ping": env.get(f"{prefix}POOL_PRE_PING", "1").lower() in ("1", "true", "yes"),
+    }
+
+def pool_stats(engines):
+    """Snapshot of each engine's connection pool, keyed by bind name."""
+    stats = {}
+    for key, engine in engines.items():
+        pool = engine.pool
+        entry = {"pool": type(pool).__name__}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, name):
+                entry[name] = getattr(pool, name)()
+        stats[key or "primary"] = entry
+    return stats
+
+def read_only(view):
+    """Mark a view as safe to serve from the read replica (when one is configured)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.pop("db_read_only", None)
+    return wrapper
+
+class RoutingSession(Session):
+    """Session that sends reads from read_only views to the replica bind.
+
+    Everything else stays on the primary: flushes, INSERT/UPDATE/DELETE,
+    SELECT ... FOR UPDATE, any query after this session wrote, and every
+    request from a client that committed a write within the last
+    DB_READ_YOUR_WRITES_SECONDS (tracked with a short-lived cookie, so it
+    works across workers), so users always see their own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is not None:
+            return bind
+        if self._flushing or isinstance(clause, UpdateBase) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["wrote"] = True
+        elif self._use_replica():
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+    def _use_replica(self):
+        if not has_request_context() or not g.get("db_read_only") or self.info.get("wrote"):
+            return False
+        if REPLICA_BIND not in self._db.engines:
+            return False
+        return not wrote_recently()
+
+def wrote_recently():
+    """Whether the requesting client committed a write within DB_READ_YOUR_WRITES_SECONDS."""
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) >= time.time()
+    except ValueError:
+        return False
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_commit(session):
+    if session.info.pop("wrote", False) and has_request_context():
+        g.db_committed_write = True
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _forget_writes(session):
+    session.info.pop("wrote", None)
+
+def init_read_your_writes(app):
+    """Set the read-your-writes cookie on responses whose request committed a write."""
+    app.config.setdefault("DB_READ_YOUR_WRITES_SECONDS", 5)
+
+    @app.after_request
+    def _set_read_your_writes_cookie(response):
+        if g.pop("db_committed_write", False):
+            window = app.config["DB_READ_YOUR_WRITES_SECONDS"]
+            response.set_cookie(READ_YOUR_WRITES_COOKIE, str(time.time() + window), max_age=window, httponly=True, samesite="Lax")
+        return response
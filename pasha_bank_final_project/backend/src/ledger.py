@@ -0,0 +1,302 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import DateTime, case, cast, delete, func, insert, literal, select, type_coerce, update
+from sqlalchemy.dialects import mysql, sqlite
+
+from . import db
+from .archive import investment_history
+from .models import ArchivedInvestment, FundingBucket, Investment, InvestmentStatus, Project, ProjectFundingRollup, ProjectStatus, User
+from .notifications import PROJECT_FUNDED, enqueue_events
+
+projects = Project.__table__
+investments_table = Investment.__table__
+archive = ArchivedInvestment.__table__
+rollups = ProjectFundingRollup.__table__
+
+MAX_BATCH_SIZE = 10000
+INSERT_CHUNK_SIZE = 1000
+ROLLUP_REBUILD_PROJECTS = 500
+
+def bucket_start(bucket, moment):
+    """Start of the hour or day (a FundingBucket) containing `moment`."""
+    if bucket == FundingBucket.DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+def _bucket_start_sql(bucket, column):
+    # SQL version of bucket_start, for GROUP BY over the ledger
+    fmt = "%Y-%m-%d 00:00:00" if bucket == FundingBucket.DAY else "%Y-%m-%d %H:00:00"
+    if db.engine.dialect.name == "mysql":
+        return cast(func.date_format(column, fmt), DateTime)
+    return type_coerce(func.strftime(fmt, column), DateTime)
+
+def record_funding(project_id, amount, invested_at, investments=1):
+    """Add investments to the project's hourly and daily rollup rows.
+
+    A single upsert; call it while holding the project row lock (as
+    apply_investment does) so concurrent writers of one project queue up.
+    """
+    rows = [
+        {
+            "project_id": project_id,
+            "bucket": bucket,
+            "bucket_start": bucket_start(bucket, invested_at),
+            "amount": amount,
+            "investment_count": investments,
+        }
+        for bucket in FundingBucket
+    ]
+    if db.engine.dialect.name == "mysql":
+        stmt = mysql.insert(rollups).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            amount=rollups.c.amount + stmt.inserted.amount,
+            investment_count=rollups.c.investment_count + stmt.inserted.investment_count,
+        )
+    else:
+        stmt = sqlite.insert(rollups).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[rollups.c.project_id, rollups.c.bucket, rollups.c.bucket_start],
+            set_={
+                "amount": rollups.c.amount + stmt.excluded.amount,
+                "investment_count": rollups.c.investment_count + stmt.excluded.investment_count,
+            },
+        )
+    db.session.execute(stmt)
+
+def apply_investment(project_id, amount, invested_at, investor_id=None, investments=1, new_investors=0):
+    """Atomically add `amount` to a FUNDING project's total.
+
+    Runs a single conditional UPDATE, so concurrent investors never lose each
+    other's increments, and flips the project to SUCCESSFUL in the same
+    statement when the goal is crossed. The same statement maintains the
+    funding stats columns (investment/investor counts, last investment time).
+    The row stays locked until the caller commits or rolls back. The
+    project's hourly and daily funding rollups are updated too.
+
+    For a single investment pass `investor_id` and the investor count is
+    bumped only if they have no earlier investment in the project; the
+    check must run before their new row is inserted. Aggregated callers pass
+    `investments` and `new_investors` instead.
+
+    Returns (applied, reached_goal). `applied` is False when the project was
+    not FUNDING at the time of the update (e.g. another investment just
+    completed it); `reached_goal` is True only for the single investment
+    that moved the project to SUCCESSFUL.
+    """
+    if investor_id is not None:
+        # A subquery inside UPDATE is a locking read, so it sees rows
+        # committed by investors that held the project lock before us
+        has_invested = select(investments_table.c.id).where(
+            investments_table.c.project_id == project_id,
+            investments_table.c.user_id == investor_id,
+        ).exists()
+        new_investors = case((has_invested, 0), else_=1)
+
+    new_amount = projects.c.current_amount + amount
+    stmt = (
+        update(projects)
+        .where(projects.c.id == project_id, projects.c.status == ProjectStatus.FUNDING)
+        # status must be assigned first: MySQL evaluates SET clauses left to
+        # right, so after current_amount is updated it would be counted twice.
+        .ordered_values(
+            (projects.c.status, case(
+                (new_amount >= projects.c.goal_amount, literal(ProjectStatus.SUCCESSFUL, projects.c.status.type)),
+                else_=projects.c.status,
+            )),
+            (projects.c.current_amount, new_amount),
+            (projects.c.investment_count, projects.c.investment_count + investments),
+            (projects.c.investor_count, projects.c.investor_count + new_investors),
+            (projects.c.last_invested_at, invested_at),
+        )
+    )
+    if db.session.execute(stmt).rowcount != 1:
+        return False, False
+    record_funding(project_id, amount, invested_at, investments)
+
+    # Our UPDATE holds the row lock, so this read sees exactly our result
+    current_amount, goal_amount, status = db.session.execute(
+        select(projects.c.current_amount, projects.c.goal_amount, projects.c.status)
+        .where(projects.c.id == project_id)
+    ).one()
+    reached_goal = status == ProjectStatus.SUCCESSFUL and current_amount - amount < goal_amount
+    return True, reached_goal
+
+def _parse_amount(value):
+    try:
+        amount = Decimal(str(value))
+    except (InvalidOperation, ValueError, TypeError):
+        return None
+    return amount if amount.is_finite() and amount > 0 else None
+
+def ingest_investments(items):
+    """Validate and record a batch of investments in the current transaction.
+
+    `items` is a list of dicts with user_id, project_id, amount and an
+    optional reference that is echoed back. Users and projects are loaded
+    with one query each (projects locked in id order), accepted rows are
+    inserted with executemany and every project gets a single aggregated
+    current_amount UPDATE. Items are applied in order; once a project's goal
+    is reached the remaining items for it are rejected, as they would be by
+    make_investment. Projects that reach their goal get a PROJECT_FUNDED
+    outbox event. The caller commits.
+
+    Returns (results, completed_project_ids), one result dict per item.
+    """
+    results = []
+    parsed = []
+    for index, item in enumerate(items):
+        result = {"index": index, "reference": item.get("reference") if isinstance(item, dict) else None}
+        results.append(result)
+        if not isinstance(item, dict):
+            result.update(status="rejected", message="Item must be an object")
+            continue
+        try:
+            user_id = int(item["user_id"])
+            project_id = int(item["project_id"])
+        except (KeyError, ValueError, TypeError):
+            result.update(status="rejected", message="Missing or invalid user_id/project_id")
+            continue
+        amount = _parse_amount(item.get("amount"))
+        if amount is None:
+            result.update(status="rejected", message="Invalid investment amount")
+            continue
+        parsed.append((result, user_id, project_id, amount))
+
+    user_ids = {user_id for _, user_id, _, _ in parsed}
+    project_ids = sorted({project_id for _, _, project_id, _ in parsed})
+    known_users = set(db.session.execute(select(User.id).where(User.id.in_(user_ids))).scalars()) if user_ids else set()
+    # Lock the batch's projects in a fixed order so concurrent batches cannot deadlock
+    project_rows = {
+        row.id: row for row in db.session.execute(
+            select(projects.c.id, projects.c.owner_id, projects.c.status, projects.c.current_amount, projects.c.goal_amount)
+            .where(projects.c.id.in_(project_ids))
+            .order_by(projects.c.id)
+            .with_for_update()
+        )
+    } if project_ids else {}
+
+    running_totals = {project_id: row.current_amount for project_id, row in project_rows.items()}
+    increments = defaultdict(Decimal)
+    rows = []
+    now = datetime.utcnow()
+    for result, user_id, project_id, amount in parsed:
+        project = project_rows.get(project_id)
+        if user_id not in known_users:
+            result.update(status="rejected", message="User not found")
+        elif project is None:
+            result.update(status="rejected", message="Project not found")
+        elif project.status != ProjectStatus.FUNDING or running_totals[project_id] >= project.goal_amount:
+            result.update(status="rejected", message="Project is not currently accepting investments")
+        elif project.owner_id == user_id:
+            result.update(status="rejected", message="Project owners cannot invest in their own projects")
+        else:
+            result.update(status="accepted")
+            running_totals[project_id] += amount
+            increments[project_id] += amount
+            rows.append({
+                "user_id": user_id,
+                "project_id": project_id,
+                "amount": amount,
+                "status": InvestmentStatus.CONFIRMED,
+                "invested_at": now,
+            })
+
+    # Investors new to a project: distinct (project, user) pairs in the batch
+    # minus the ones already in the ledger (locking read, see apply_investment)
+    batch_pairs = {(row["project_id"], row["user_id"]) for row in rows}
+    existing_pairs = set()
+    if batch_pairs:
+        existing_pairs = set(db.session.execute(
+            select(investments_table.c.project_id, investments_table.c.user_id).distinct()
+            .where(
+                investments_table.c.project_id.in_({p for p, _ in batch_pairs}),
+                investments_table.c.user_id.in_({u for _, u in batch_pairs}),
+            )
+            .with_for_update(read=True)
+        ).tuples())
+    new_investors = defaultdict(int)
+    for project_id, _ in batch_pairs - existing_pairs:
+        new_investors[project_id] += 1
+    investment_counts = defaultdict(int)
+    for row in rows:
+        investment_counts[row["project_id"]] += 1
+
+    completed = []
+    for project_id in sorted(increments):
+        # The rows are locked and known to be FUNDING, so this always applies
+        _, reached_goal = apply_investment(
+            project_id, increments[project_id], now,
+            investments=investment_counts[project_id], new_investors=new_investors[project_id],
+        )
+        if reached_goal:
+            completed.append(project_id)
+
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(insert(Investment.__table__), rows[start:start + INSERT_CHUNK_SIZE])
+    # Their investors are notified by the notification worker
+    enqueue_events(PROJECT_FUNDED, completed)
+    return results, completed
+
+def rebuild_project_stats():
+    """Recompute every project's funding stats columns from the ledger.
+
+    One set-based UPDATE with correlated subqueries; use it when the
+    incrementally maintained counters are suspected to have drifted.
+    Archived investments count too: a project's rows are all in one of the
+    two tables, so the per-table aggregates simply add up.
+    Returns the number of projects updated.
+    """
+    def aggregate(table, expression):
+        confirmed = (table.c.project_id == projects.c.id) & (table.c.status == InvestmentStatus.CONFIRMED)
+        return select(expression).where(confirmed).scalar_subquery()
+
+    hot, cold = investments_table, archive
+    stmt = update(projects).values(
+        investment_count=aggregate(hot, func.count(hot.c.id)) + aggregate(cold, func.count(cold.c.id)),
+        investor_count=aggregate(hot, func.count(hot.c.user_id.distinct())) + aggregate(cold, func.count(cold.c.user_id.distinct())),
+        last_invested_at=func.coalesce(aggregate(hot, func.max(hot.c.invested_at)), aggregate(cold, func.max(cold.c.invested_at))),
+    )
+    return db.session.execute(stmt).rowcount
+
+def rebuild_funding_rollups(project_ids=None):
+    """Recompute the hourly and daily funding rollups from the ledger.
+
+    For every project, or only `project_ids`. Works through
+    ROLLUP_REBUILD_PROJECTS projects per transaction and commits each: their
+    rows are locked first, so investments arriving meanwhile wait instead of
+    being lost or counted twice. Returns the number of rollup rows written.
+    """
+    if project_ids is None:
+        project_ids = db.session.execute(select(projects.c.id).order_by(projects.c.id)).scalars().all()
+    project_ids = sorted(project_ids)
+    written = 0
+    for start in range(0, len(project_ids), ROLLUP_REBUILD_PROJECTS):
+        chunk = project_ids[start:start + ROLLUP_REBUILD_PROJECTS]
+        try:
+            db.session.execute(select(projects.c.id).where(projects.c.id.in_(chunk)).order_by(projects.c.id).with_for_update())
+            db.session.execute(delete(rollups).where(rollups.c.project_id.in_(chunk)))
+            # Archived investments included
+            history = investment_history(where=lambda t: t.c.project_id.in_(chunk) & (t.c.status == InvestmentStatus.CONFIRMED))
+            for bucket in FundingBucket:
+                started = _bucket_start_sql(bucket, history.c.invested_at)
+                rows = [
+                    {"project_id": row.project_id, "bucket": bucket, "bucket_start": row.bucket_start, "amount": row.amount, "investment_count": row.investment_count}
+                    for row in db.session.execute(
+                        select(
+                            history.c.project_id,
+                            started.label("bucket_start"),
+                            func.sum(history.c.amount).label("amount"),
+                            func.count().label("investment_count"),
+                        )
+                        .group_by(history.c.project_id, started)
+                    )
+                ]
+                for offset in range(0, len(rows), INSERT_CHUNK_SIZE):
+                    db.session.execute(insert(rollups), rows[offset:offset + INSERT_CHUNK_SIZE])
+                written += len(rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    return written
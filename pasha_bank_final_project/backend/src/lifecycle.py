@@ -0,0 +1,118 @@
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import select, update
+
+from . import db
+from .cache import response_cache
+from .models import Project, ProjectStatus
+from .notifications import PROJECT_FUNDED, enqueue_events
+
+sweeper_logger = logging.getLogger("pasha.sweeper")
+
+projects = Project.__table__
+
+SWEEP_BATCH_SIZE = 500
+
+def _close_batch(today, batch_size):
+    """Close one batch of expired projects; returns (ids, successful, failed)."""
+    # Walks ix_projects_status_end_date. SKIP LOCKED lets sweepers on other
+    # nodes take the next batch instead of waiting on (or redoing) this one.
+    ids = db.session.execute(
+        select(projects.c.id)
+        .where(projects.c.status == ProjectStatus.FUNDING, projects.c.end_date < today)
+        .order_by(projects.c.end_date, projects.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not ids:
+        return ids, 0, 0
+
+    # Still-FUNDING re-check: rowcounts only include projects this sweeper
+    # closed, even where the database has no row locks (SQLite)
+    reached_goal = projects.c.current_amount >= projects.c.goal_amount
+    closed = {}
+    now = datetime.utcnow()
+    for status, condition in ((ProjectStatus.SUCCESSFUL, reached_goal), (ProjectStatus.FAILED, ~reached_goal)):
+        closed[status] = db.session.execute(
+            update(projects)
+            .where(projects.c.id.in_(ids), projects.c.status == ProjectStatus.FUNDING, condition)
+            .values(status=status, updated_at=now)
+        ).rowcount
+    if closed[ProjectStatus.SUCCESSFUL]:
+        # Their investors are notified like for the investment that reaches
+        # the goal, in the same transaction as the status change. updated_at
+        # picks out the rows this UPDATE changed.
+        funded = db.session.execute(
+            select(projects.c.id)
+            .where(projects.c.id.in_(ids), projects.c.status == ProjectStatus.SUCCESSFUL, projects.c.updated_at == now)
+        ).scalars().all()
+        enqueue_events(PROJECT_FUNDED, funded)
+    db.session.commit()
+    return ids, closed[ProjectStatus.SUCCESSFUL], closed[ProjectStatus.FAILED]
+
+def sweep_expired_projects(today=None, batch_size=SWEEP_BATCH_SIZE):
+    """Move FUNDING projects whose end_date has passed to SUCCESSFUL or FAILED.
+
+    Projects close the day after their end_date (UTC). Works in batches of
+    `batch_size`, each its own short transaction, so it never holds many
+    row locks and can run next to live traffic and other sweepers.
+    Projects closed as SUCCESSFUL get a PROJECT_FUNDED outbox event.
+    Returns run stats: batches, processed, successful, failed, seconds.
+    """
+    today = today or datetime.utcnow().date()
+    stats = {"batches": 0, "processed": 0, "successful": 0, "failed": 0}
+    started = time.perf_counter()
+    while True:
+        try:
+            ids, successful, failed = _close_batch(today, batch_size)
+        except Exception:
+            db.session.rollback()
+            raise
+        if not ids:
+            break
+        stats["batches"] += 1
+        stats["processed"] += successful + failed
+        stats["successful"] += successful
+        stats["failed"] += failed
+        response_cache.invalidate(*(f"project:{project_id}" for project_id in ids))
+        if len(ids) < batch_size:
+            break
+    if stats["processed"]:
+        response_cache.invalidate("projects")
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    sweeper_logger.info(
+        f"Closed {stats['processed']} expired projects ({stats['successful']} successful, "
+        f"{stats['failed']} failed) in {stats['batches']} batches, {stats['seconds']}s"
+    )
+    return stats
+
+def write_sweep_metrics(path, stats, totals):
+    """Write run metrics in Prometheus text format for node_exporter's textfile collector.
+
+    `totals` accumulates outcomes across runs of a long-running worker.
+    The file is replaced atomically so the collector never reads half of it.
+    """
+    lines = [
+        "# HELP pasha_sweeper_last_run_timestamp_seconds When the last sweep finished.",
+        "# TYPE pasha_sweeper_last_run_timestamp_seconds gauge",
+        f"pasha_sweeper_last_run_timestamp_seconds {time.time():.0f}",
+        "# HELP pasha_sweeper_last_run_duration_seconds Duration of the last sweep.",
+        "# TYPE pasha_sweeper_last_run_duration_seconds gauge",
+        f"pasha_sweeper_last_run_duration_seconds {stats['seconds']}",
+        "# HELP pasha_sweeper_last_run_projects Projects closed by the last sweep.",
+        "# TYPE pasha_sweeper_last_run_projects gauge",
+        f'pasha_sweeper_last_run_projects{{outcome="successful"}} {stats["successful"]}',
+        f'pasha_sweeper_last_run_projects{{outcome="failed"}} {stats["failed"]}',
+        "# HELP pasha_sweeper_projects_total Projects closed since the worker started.",
+        "# TYPE pasha_sweeper_projects_total counter",
+        f'pasha_sweeper_projects_total{{outcome="successful"}} {totals["successful"]}',
+        f'pasha_sweeper_projects_total{{outcome="failed"}} {totals["failed"]}',
+    ]
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".sweeper-", suffix=".prom")
+    with os.fdopen(fd, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .database import pool_stats
+
+slow_query_logger = logging.getLogger("pasha.slow_query")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+class Histogram:
+    """Prometheus-style cumulative histogram with labels (thread-safe)."""
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(snapshot):
+            label_str = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if bound == "+Inf" else repr(float(bound))
+                lines.append(f'{self.name}_bucket{{{label_str},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label_str}}} {total}")
+            lines.append(f"{self.name}_count{{{label_str}}} {cumulative}")
+        return lines
+
+class PerfInstrumentation:
+    """Per-request latency, SQL statement count and DB time.
+
+    Each response gets a Server-Timing header (app;dur, db;dur) and the
+    numbers feed histograms exposed in Prometheus text format at /metrics.
+    Metrics are per process: with several gunicorn workers, scrape each one
+    or aggregate at the collector. Statements slower than SLOW_QUERY_MS
+    are logged with their SQL text (parameters are left out).
+    """
+
+    def __init__(self, app=None):
+        self.request_latency = Histogram(
+            "http_request_duration_seconds", "Request latency by endpoint.",
+            ("endpoint", "method", "status"), LATENCY_BUCKETS,
+        )
+        self.request_statements = Histogram(
+            "http_request_sql_statements", "SQL statements executed per request.",
+            ("endpoint",), STATEMENT_BUCKETS,
+        )
+        self.request_db_time = Histogram(
+            "http_request_db_duration_seconds", "Time spent in SQL per request.",
+            ("endpoint",), LATENCY_BUCKETS,
+        )
+        self.slow_query_ms = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_ENABLED", True)
+        app.config.setdefault("SLOW_QUERY_MS", None)  # e.g. 200 to log slow statements
+        app.extensions["perf_instrumentation"] = self
+        if not app.config["METRICS_ENABLED"]:
+            return
+        self.slow_query_ms = app.config["SLOW_QUERY_MS"]
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view)
+
+    def reset(self):
+        """Forget everything observed so far (e.g. warm-up requests)."""
+        for histogram in (self.request_latency, self.request_statements, self.request_db_time):
+            histogram.reset()
+
+    @staticmethod
+    def _start_request():
+        g.perf_started = time.perf_counter()
+        g.perf_sql_count = 0
+        g.perf_db_time = 0.0
+
+    def _finish_request(self, response):
+        started = g.pop("perf_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        sql_count = g.pop("perf_sql_count", 0)
+        db_time = g.pop("perf_db_time", 0.0)
+        endpoint = request.endpoint or "unmatched"
+
+        self.request_latency.observe((endpoint, request.method, str(response.status_code)), elapsed)
+        self.request_statements.observe((endpoint,), sql_count)
+        self.request_db_time.observe((endpoint,), db_time)
+        response.headers["Server-Timing"] = (
+            f'app;dur={elapsed * 1000:.1f}, db;dur={db_time * 1000:.1f};desc="{sql_count} queries"'
+        )
+        return response
+
+    def record_statement(self, statement, duration):
+        if not has_request_context() or "perf_started" not in g:
+            return
+        g.perf_sql_count += 1
+        g.perf_db_time += duration
+        if self.slow_query_ms is not None and duration * 1000 >= self.slow_query_ms:
+            slow_query_logger.warning(
+                f"Slow query ({duration * 1000:.1f} ms) in {request.endpoint}: {' '.join(statement.split())}"
+            )
+
+    def metrics_view(self):
+        from . import db
+
+        lines = []
+        for histogram in (self.request_latency, self.request_statements, self.request_db_time):
+            lines.extend(histogram.expose())
+        lines.append("# HELP db_pool_connections Connections per pool state and bind.")
+        lines.append("# TYPE db_pool_connections gauge")
+        for bind, stats in pool_stats(db.engines).items():
+            for state in ("checkedout", "checkedin", "overflow"):
+                if state in stats:
+                    lines.append(f'db_pool_connections{{bind="{bind}",state="{state}"}} {stats[state]}')
+        load_shedder = current_app.extensions.get("load_shedder")
+        if load_shedder is not None and load_shedder.max_in_flight is not None:
+            lines.append("# HELP http_requests_in_flight Requests admitted and not yet finished.")
+            lines.append("# TYPE http_requests_in_flight gauge")
+            lines.append(f"http_requests_in_flight {load_shedder.in_flight}")
+            lines.append("# HELP http_requests_shed_total Requests rejected with 503 by load shedding.")
+            lines.append("# TYPE http_requests_shed_total counter")
+            lines.append(f"http_requests_shed_total {load_shedder.shed}")
+        return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+perf_instrumentation = PerfInstrumentation()
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.perf_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "perf_started", None)
+    if started is not None:
+        perf_instrumentation.record_statement(statement, time.perf_counter() - started)
@@ -1,7 +1,8 @@
 import enum
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import DDL, event
 from . import db # Import db from the current package (__init__.py)
+from .passwords import password_hasher
 
 class UserRole(enum.Enum):
     INVESTOR = "investor"
@@ -20,6 +21,15 @@ class InvestmentStatus(enum.Enum):
     CONFIRMED = "confirmed"
     FAILED = "failed"
 
+class FundingBucket(enum.Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+class NotificationStatus(enum.Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
 class User(db.Model):
     __tablename__ = "users"
 
@@ -36,10 +46,13 @@ class User(db.Model):
     projects_owned = db.relationship("Project", back_populates="owner", lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f"<User {self.username}>"
@@ -54,7 +67,15 @@ class Project(db.Model):
     image_url = db.Column(db.String(255), nullable=True)
     goal_amount = db.Column(db.Numeric(10, 2), nullable=False)
     current_amount = db.Column(db.Numeric(10, 2), default=0.00, nullable=False)
+    # Stored generated column so "closest to goal" ordering can use an index.
+    # Rounded to the column's scale, so the value a page cursor carries is
+    # exactly the stored one (keyset pagination compares against it)
+    funding_progress = db.Column(db.Numeric(12, 4), db.Computed("ROUND(1.0 * current_amount / goal_amount, 4)", persisted=True))
     status = db.Column(db.Enum(ProjectStatus), default=ProjectStatus.DRAFT, nullable=False)
+    # Funding stats, maintained incrementally by ledger.apply_investment
+    investment_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    investor_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    last_invested_at = db.Column(db.DateTime, nullable=True)
     start_date = db.Column(db.Date, nullable=True)
     end_date = db.Column(db.Date, nullable=True)
     owner_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -65,6 +86,21 @@ class Project(db.Model):
     investments = db.relationship("Investment", back_populates="project", lazy=True, cascade="all, delete-orphan")
     updates = db.relationship("ProjectUpdate", back_populates="project", lazy=True, cascade="all, delete-orphan")
 
+    # Composite indexes backing the catalogue's keyset pagination (see routes/projects.py)
+    __table_args__ = (
+        db.Index("ix_projects_status_created_at", "status", "created_at", "id"),
+        db.Index("ix_projects_status_category_created_at", "status", "category", "created_at", "id"),
+        db.Index("ix_projects_status_end_date", "status", "end_date", "id"),
+        db.Index("ix_projects_status_funding_progress", "status", "funding_progress", "id"),
+        # Full-text search (see search.py); SQLite uses the FTS5 table below instead
+        db.Index("ft_projects_search", "title", "description", "category", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
+    @property
+    def owner_username(self):
+        # Same name as the column label used by the catalogue's row queries
+        return self.owner.username
+
     def __repr__(self):
         return f"<Project {self.title}>"
 
@@ -81,9 +117,56 @@ class Investment(db.Model):
     investor = db.relationship("User", back_populates="investments")
     project = db.relationship("Project", back_populates="investments")
 
+    __table_args__ = (
+        # "Has this user invested in this project before?" (investor_count upkeep)
+        db.Index("ix_investments_project_id_user_id", "project_id", "user_id"),
+        # Covering indexes: a user's investments newest first (listings, exports,
+        # portfolio summary) and a project's investors/amounts by status (stats
+        # and rollup rebuilds, notification fan-out) are read from the index alone
+        db.Index("ix_investments_user_id_invested_at", "user_id", "invested_at", "project_id", "amount", "status"),
+        db.Index("ix_investments_project_id_status_user_id", "project_id", "status", "user_id", "invested_at", "amount"),
+    )
+
     def __repr__(self):
         return f"<Investment {self.id} - User {self.user_id} -> Project {self.project_id}>"
 
+# Investments in projects closed long ago, moved out of the hot table by
+# archive.archive_investments. Same columns and ids as investments; a
+# project's investments are either all here or all there.
+class ArchivedInvestment(db.Model):
+    __tablename__ = "investments_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False)
+    amount = db.Column(db.Numeric(10, 2), nullable=False)
+    status = db.Column(db.Enum(InvestmentStatus), nullable=False)
+    invested_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_investments_archive_user_id_invested_at", "user_id", "invested_at"),
+        db.Index("ix_investments_archive_project_id_status", "project_id", "status"),
+    )
+
+    def __repr__(self):
+        return f"<ArchivedInvestment {self.id} - User {self.user_id} -> Project {self.project_id}>"
+
+# Confirmed investments into a project per hour and per day, maintained
+# incrementally by ledger.apply_investment (rebuilt by rebuild_funding_rollups).
+# The primary key doubles as the index for time-range reads of one project.
+class ProjectFundingRollup(db.Model):
+    __tablename__ = "project_funding_rollups"
+
+    project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), primary_key=True)
+    bucket = db.Column(db.Enum(FundingBucket), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    amount = db.Column(db.Numeric(12, 2), default=0.00, nullable=False)
+    investment_count = db.Column(db.Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<ProjectFundingRollup {self.project_id} {self.bucket.value} {self.bucket_start}>"
+
 class ProjectUpdate(db.Model):
     __tablename__ = "project_updates"
 
@@ -94,7 +177,71 @@ class ProjectUpdate(db.Model):
 
     project = db.relationship("Project", back_populates="updates")
 
+    __table_args__ = (
+        # Backs the paginated /api/projects/<id>/updates listing (newest first)
+        db.Index("ix_project_updates_project_id_created_at", "project_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<ProjectUpdate {self.id} for Project {self.project_id}>"
 
+# Transactional outbox: written in the same transaction as the state change
+# it announces, fanned out to recipients later by the notification worker
+# (see notifications.py)
+class OutboxEvent(db.Model):
+    __tablename__ = "outbox_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), nullable=False)
+    payload = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # The worker claims unprocessed events oldest first
+        db.Index("ix_outbox_events_processed_at_id", "processed_at", "id"),
+    )
 
+    def __repr__(self):
+        return f"<OutboxEvent {self.id} {self.event_type} for Project {self.project_id}>"
+
+# One event for one recipient, delivered (and retried) by the notification worker
+class Notification(db.Model):
+    __tablename__ = "notifications"
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey("outbox_events.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    status = db.Column(db.Enum(NotificationStatus), default=NotificationStatus.PENDING, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.String(500), nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("event_id", "user_id", name="uq_notifications_event_id_user_id"),
+        # Pending notifications that are due, grouped by recipient
+        db.Index("ix_notifications_status_available_at_user_id", "status", "available_at", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<Notification {self.id} - Event {self.event_id} -> User {self.user_id}>"
+
+# SQLite full-text index: an external-content FTS5 table over projects, kept
+# in sync by triggers so every write path (ORM, bulk Core statements,
+# imports) updates it. MySQL maintains its FULLTEXT index by itself.
+PROJECTS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS projects_fts USING fts5("
+    "title, description, category, content='projects', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS projects_fts_ai AFTER INSERT ON projects BEGIN "
+    "INSERT INTO projects_fts(rowid, title, description, category) VALUES (new.id, new.title, new.description, new.category); END",
+    "CREATE TRIGGER IF NOT EXISTS projects_fts_ad AFTER DELETE ON projects BEGIN "
+    "INSERT INTO projects_fts(projects_fts, rowid, title, description, category) VALUES ('delete', old.id, old.title, old.description, old.category); END",
+    "CREATE TRIGGER IF NOT EXISTS projects_fts_au AFTER UPDATE OF title, description, category ON projects BEGIN "
+    "INSERT INTO projects_fts(projects_fts, rowid, title, description, category) VALUES ('delete', old.id, old.title, old.description, old.category); "
+    "INSERT INTO projects_fts(rowid, title, description, category) VALUES (new.id, new.title, new.description, new.category); END",
+)
+for _statement in PROJECTS_FTS_DDL:
+    event.listen(Project.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Project.__table__, "before_drop", DDL("DROP TABLE IF EXISTS projects_fts").execute_if(dialect="sqlite"))
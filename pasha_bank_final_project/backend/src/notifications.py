@@ -0,0 +1,322 @@
+import json
+import logging
+import random
+import smtplib
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from flask import current_app
+from sqlalchemy import DateTime, Integer, insert, literal, select, update
+
+from . import db
+from .archive import investment_history
+from .models import InvestmentStatus, Notification, NotificationStatus, OutboxEvent, Project, ProjectUpdate, User
+
+notification_logger = logging.getLogger("pasha.notifications")
+
+outbox = OutboxEvent.__table__
+notifications = Notification.__table__
+
+# Event types
+PROJECT_FUNDED = "project_funded"
+PROJECT_UPDATE_POSTED = "project_update_posted"
+
+FANOUT_BATCH_SIZE = 100
+DELIVERY_BATCH_SIZE = 500
+
+def enqueue_event(event_type, project_id, payload=None):
+    """Record an event in the outbox as part of the caller's transaction.
+
+    A single INSERT; recipients are resolved and notified later by the
+    notification worker, so this costs the request nothing else.
+    """
+    db.session.execute(insert(outbox).values(
+        event_type=event_type, project_id=project_id, payload=payload, created_at=datetime.utcnow(),
+    ))
+
+def enqueue_events(event_type, project_ids):
+    """enqueue_event for several projects at once (one executemany INSERT)."""
+    if not project_ids:
+        return
+    now = datetime.utcnow()
+    db.session.execute(insert(outbox), [
+        {"event_type": event_type, "project_id": project_id, "payload": None, "created_at": now}
+        for project_id in project_ids
+    ])
+
+class NotificationSink:
+    """Where notifications are delivered.
+
+    `send` delivers one message or raises. The worker enters the sink
+    (`with sink:`) around each batch, so it can keep a connection open.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def send(self, recipient, subject, body):
+        raise NotImplementedError
+
+class FileSink(NotificationSink):
+    """Appends each message to a file as a JSON line (development, demos)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file.close()
+        self._file = None
+        return False
+
+    def send(self, recipient, subject, body):
+        self._file.write(json.dumps({
+            "to": recipient.email,
+            "subject": subject,
+            "body": body,
+            "sent_at": datetime.utcnow().isoformat(),
+        }) + "\n")
+
+class SMTPSink(NotificationSink):
+    """Sends e-mail over one SMTP connection per batch.
+
+    For development point it at a local stand-in, e.g.
+    `python -m aiosmtpd -n -l localhost:1025` or MailHog.
+    """
+
+    def __init__(self, host, port, sender, username=None, password=None, starttls=False, timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._smtp = None
+
+    def __enter__(self):
+        self._smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            self._smtp.starttls()
+        if self.username:
+            self._smtp.login(self.username, self.password)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self._smtp.quit()
+        except smtplib.SMTPException:
+            pass
+        self._smtp = None
+        return False
+
+    def send(self, recipient, subject, body):
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = recipient.email
+        message["Subject"] = subject
+        message.set_content(body)
+        self._smtp.send_message(message)
+
+def create_sink(config):
+    """The sink selected by NOTIFICATION_SINK (file | smtp)."""
+    kind = config.get("NOTIFICATION_SINK", "file")
+    if kind == "file":
+        return FileSink(config.get("NOTIFICATION_FILE", "notifications.ndjson"))
+    if kind == "smtp":
+        return SMTPSink(
+            config.get("NOTIFICATION_SMTP_HOST", "localhost"),
+            config.get("NOTIFICATION_SMTP_PORT", 1025),
+            config.get("NOTIFICATION_SENDER", "noreply@pasha-community.local"),
+            username=config.get("NOTIFICATION_SMTP_USERNAME"),
+            password=config.get("NOTIFICATION_SMTP_PASSWORD"),
+            starttls=config.get("NOTIFICATION_SMTP_STARTTLS", False),
+        )
+    raise RuntimeError(f"Unknown NOTIFICATION_SINK: {kind}")
+
+def _fan_out_batch(batch_size):
+    """Turn one batch of outbox events into per-recipient notifications.
+
+    Returns (events, notifications created).
+    """
+    events = db.session.execute(
+        select(outbox.c.id, outbox.c.project_id)
+        .where(outbox.c.processed_at.is_(None))
+        .order_by(outbox.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not events:
+        return 0, 0
+
+    now = datetime.utcnow()
+    created = 0
+    for event in events:
+        # Every investor of the project once (archived investments included),
+        # in one INSERT ... SELECT however many there are
+        history = investment_history(
+            where=lambda t: (t.c.project_id == event.project_id) & (t.c.status == InvestmentStatus.CONFIRMED)
+        )
+        recipients = (
+            select(
+                literal(event.id, Integer), history.c.user_id,
+                literal(NotificationStatus.PENDING, notifications.c.status.type),
+                literal(0, Integer), literal(now, DateTime),
+            )
+            .distinct()
+        )
+        created += db.session.execute(
+            insert(notifications).from_select(["event_id", "user_id", "status", "attempts", "available_at"], recipients)
+        ).rowcount
+    db.session.execute(update(outbox).where(outbox.c.id.in_([event.id for event in events])).values(processed_at=now))
+    db.session.commit()
+    return len(events), created
+
+def _describe_events(event_ids):
+    """One line of text per event id, for the message bodies."""
+    events = db.session.execute(
+        select(outbox.c.id, outbox.c.event_type, outbox.c.project_id, outbox.c.payload).where(outbox.c.id.in_(event_ids))
+    ).all()
+    titles = dict(db.session.execute(
+        select(Project.id, Project.title).where(Project.id.in_({event.project_id for event in events}))
+    ).all())
+    update_ids = {event.payload["update_id"] for event in events if event.event_type == PROJECT_UPDATE_POSTED}
+    update_texts = dict(db.session.execute(
+        select(ProjectUpdate.id, ProjectUpdate.update_text).where(ProjectUpdate.id.in_(update_ids))
+    ).all()) if update_ids else {}
+
+    lines = {}
+    for event in events:
+        title = titles.get(event.project_id, f"Project {event.project_id}")
+        if event.event_type == PROJECT_FUNDED:
+            lines[event.id] = f"{title} has reached its funding goal. Thank you for your support!"
+        elif event.event_type == PROJECT_UPDATE_POSTED:
+            lines[event.id] = f"New update from {title}: {update_texts.get(event.payload['update_id'], '')}"
+        else:
+            lines[event.id] = f"News from {title}"
+    return lines
+
+def _compose(recipient, lines):
+    subject = lines[0] if len(lines) == 1 else f"{len(lines)} updates on projects you support"
+    body = "\n\n".join([f"Hi {recipient.username},", *lines, "The Pasha Community team"])
+    return subject[:150], body
+
+def _retry_delay(attempts, base, cap):
+    # Exponential backoff with jitter, so a failing sink isn't hammered in lockstep
+    return min(cap, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+def _deliver_batch(sink, batch_size):
+    """Send one batch of due notifications, one message per recipient.
+
+    Returns (claimed, sent, retried, failed) counts of notifications.
+    """
+    config = current_app.config
+    max_attempts = config.get("NOTIFICATION_MAX_ATTEMPTS", 8)
+    retry_base = config.get("NOTIFICATION_RETRY_BASE", 30)
+    retry_max = config.get("NOTIFICATION_RETRY_MAX", 3600)
+
+    now = datetime.utcnow()
+    due = db.session.execute(
+        select(notifications.c.id, notifications.c.event_id, notifications.c.user_id, notifications.c.attempts)
+        .where(notifications.c.status == NotificationStatus.PENDING, notifications.c.available_at <= now)
+        .order_by(notifications.c.user_id, notifications.c.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not due:
+        return 0, 0, 0, 0
+
+    by_user = defaultdict(list)
+    for row in due:
+        by_user[row.user_id].append(row)
+    users = {user.id: user for user in db.session.execute(select(User.id, User.username, User.email).where(User.id.in_(by_user)))}
+    lines = _describe_events({row.event_id for row in due})
+
+    delivered, errors = [], {}
+    try:
+        with sink:
+            for user_id, rows in by_user.items():
+                try:
+                    if user_id not in users:
+                        raise LookupError("User not found")
+                    sink.send(users[user_id], *_compose(users[user_id], [lines[row.event_id] for row in rows]))
+                except Exception as e:
+                    errors[user_id] = e
+                else:
+                    delivered.append(user_id)
+    except Exception as e:
+        # The sink itself is unavailable (e.g. SMTP server down): retry everyone not yet served
+        for user_id in by_user:
+            if user_id not in delivered:
+                errors.setdefault(user_id, e)
+
+    sent_ids = [row.id for user_id in delivered for row in by_user[user_id]]
+    if sent_ids:
+        db.session.execute(
+            update(notifications).where(notifications.c.id.in_(sent_ids))
+            .values(status=NotificationStatus.SENT, sent_at=now, attempts=notifications.c.attempts + 1)
+        )
+    retried = failed = 0
+    for user_id, error in errors.items():
+        notification_logger.warning(f"Delivery to user {user_id} failed: {error}")
+        for row in by_user[user_id]:
+            attempts = row.attempts + 1
+            give_up = attempts >= max_attempts
+            db.session.execute(
+                update(notifications).where(notifications.c.id == row.id).values(
+                    status=NotificationStatus.FAILED if give_up else NotificationStatus.PENDING,
+                    attempts=attempts,
+                    available_at=now + timedelta(seconds=_retry_delay(attempts, retry_base, retry_max)),
+                    last_error=str(error)[:500],
+                )
+            )
+            failed += give_up
+            retried += not give_up
+    db.session.commit()
+    return len(due), len(sent_ids), retried, failed
+
+def process_notifications(sink, batch_size=DELIVERY_BATCH_SIZE, fanout_batch_size=FANOUT_BATCH_SIZE):
+    """One worker pass: fan out every pending outbox event, then deliver
+    every notification that is due.
+
+    Events and notifications are claimed with SKIP LOCKED in short
+    transactions, so several workers can run side by side. Failed
+    deliveries are retried with exponential backoff (NOTIFICATION_RETRY_BASE
+    seconds, doubling up to NOTIFICATION_RETRY_MAX) and marked FAILED after
+    NOTIFICATION_MAX_ATTEMPTS. Returns run stats.
+    """
+    stats = {"events": 0, "notifications": 0, "sent": 0, "retried": 0, "failed": 0}
+    started = time.perf_counter()
+    try:
+        while True:
+            events, created = _fan_out_batch(fanout_batch_size)
+            stats["events"] += events
+            stats["notifications"] += created
+            if events < fanout_batch_size:
+                break
+        while True:
+            claimed, sent, retried, failed = _deliver_batch(sink, batch_size)
+            stats["sent"] += sent
+            stats["retried"] += retried
+            stats["failed"] += failed
+            if claimed < batch_size:
+                break
+    except Exception:
+        db.session.rollback()
+        raise
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    if stats["events"] or stats["sent"] or stats["retried"] or stats["failed"]:
+        notification_logger.info(
+            f"Fanned out {stats['events']} events to {stats['notifications']} notifications; "
+            f"sent {stats['sent']}, retrying {stats['retried']}, failed {stats['failed']} in {stats['seconds']}s"
+        )
+    return stats
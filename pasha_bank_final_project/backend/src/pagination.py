@@ -0,0 +1,41 @@
+import base64
+import json
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(sort, value, row_id):
+    """Opaque cursor pointing just past (value, row_id) in the given ordering."""
+    payload = json.dumps([sort, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor, sort):
+    """Return (value, row_id) from a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if cursor_sort != sort or not isinstance(row_id, int):
+        raise InvalidCursor("Cursor does not match the requested sort")
+    return value, row_id
+
+def page_size(raw):
+    """Clamp the ?limit= argument to [1, MAX_PAGE_SIZE]."""
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(raw, MAX_PAGE_SIZE))
+
+def keyset_filter(column, id_column, value, row_id, descending):
+    """WHERE clause selecting rows after (value, row_id) in ORDER BY column, id.
+
+    Spelled out with OR rather than a row-value comparison so MySQL can use
+    the composite index for a range scan.
+    """
+    if descending:
+        return or_(column < value, and_(column == value, id_column < row_id))
+    return or_(column > value, and_(column == value, id_column > row_id))
@@ -0,0 +1,106 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from flask import jsonify
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from .config import web_concurrency, worker_threads
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hashes are already queued; the caller should retry later."""
+
+class PasswordHasher:
+    """Runs password hashing in a bounded process pool.
+
+    Hashing is deliberately CPU-expensive; doing it in the request worker
+    lets a login storm starve every other request. Here the work runs in
+    at most PASSWORD_HASH_WORKERS processes and at most
+    PASSWORD_HASH_MAX_PENDING hashes may be queued, beyond which
+    PasswordHasherBusy is raised (turned into a 503 by the app).
+
+    Every web worker process gets its own pool, so by default the CPUs are
+    split between the workers (cpu_count // WEB_CONCURRENCY, at least one
+    each), and hashes may occupy all but one of a worker's request threads,
+    keeping a thread free for everything else.
+
+    PASSWORD_HASH_METHOD is a werkzeug method string carrying the algorithm
+    and cost, spelled out in full as it appears in stored hashes, e.g.
+    "scrypt:32768:8:1" or "pbkdf2:sha256:600000". Hashes made with other
+    parameters are reported by `needs_rehash` so login can upgrade them
+    transparently.
+    """
+
+    def __init__(self, app=None):
+        self.method = "scrypt:32768:8:1"
+        self.workers = 0
+        self.max_pending = 0
+        self.timeout = None
+        self._executor = None
+        self._executor_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+        app.config.setdefault("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 1) // web_concurrency()))  # 0 hashes inline
+        app.config.setdefault("PASSWORD_HASH_MAX_PENDING", max(1, worker_threads() - 1))
+        app.config.setdefault("PASSWORD_HASH_TIMEOUT", 30)
+        self.method = app.config["PASSWORD_HASH_METHOD"]
+        self.workers = app.config["PASSWORD_HASH_WORKERS"]
+        self.max_pending = app.config["PASSWORD_HASH_MAX_PENDING"]
+        self.timeout = app.config["PASSWORD_HASH_TIMEOUT"]
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        app.extensions["password_hasher"] = self
+
+        @app.errorhandler(PasswordHasherBusy)
+        def handle_hasher_busy(e):
+            response = jsonify({"message": "Server is busy, please try again shortly"})
+            response.headers["Retry-After"] = "1"
+            return response, 503
+
+    def _get_executor(self):
+        # Pools don't survive fork; start a fresh one in each worker process
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._executor_pid = os.getpid()
+                atexit.register(self._executor.shutdown, wait=False, cancel_futures=True)
+            return self._executor
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            return self._get_executor().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def hash_many(self, passwords):
+        """Hash a batch across the whole pool (bulk imports; ignores the pending limit)."""
+        if not self.workers:
+            return [generate_password_hash(password, self.method) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        return list(self._get_executor().map(generate_password_hash, passwords, repeat(self.method), chunksize=chunksize))
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with a different method or cost than configured."""
+        return password_hash.split("$", 1)[0] != self.method
+
+password_hasher = PasswordHasher()
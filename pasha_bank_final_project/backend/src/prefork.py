@@ -0,0 +1,80 @@
+import gc
+import logging
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+
+from . import db
+
+prefork_logger = logging.getLogger("pasha.prefork")
+
+# Cheap public reads that go through the common code paths (routing, JSON,
+# the catalogue queries, the SPA shell)
+DEFAULT_WARMUP_PATHS = ("/api/health", "/api/projects", "/api/projects/search?q=community", "/")
+
+def warm_up(app):
+    """Do the one-off work of the first requests now: configure the mappers,
+    import lazily loaded modules and fill SQLAlchemy's compiled statement
+    cache (kept per engine, so it survives the pool being disposed).
+
+    The warm-up requests run through the test client; if the database is
+    unreachable only the mappers are configured.
+    """
+    started = time.perf_counter()
+    configure_mappers()
+    with app.app_context():
+        try:
+            with db.engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except SQLAlchemyError as e:
+            prefork_logger.warning(f"Database unreachable, skipping warm-up requests: {e}")
+            return
+
+    client = app.test_client()
+    for path in app.config.get("PRELOAD_WARMUP_PATHS", DEFAULT_WARMUP_PATHS):
+        response = client.get(path)
+        if response.status_code >= 500:
+            prefork_logger.warning(f"Warm-up request {path} failed with {response.status_code}")
+    prefork_logger.debug(f"Warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def _reset_process_state(app):
+    # Per-process caches and counters shouldn't start out holding the warm-up's traffic
+    from .cache import LRUCache, response_cache
+    from .metrics import perf_instrumentation
+    from .throttling import MemoryRateLimitBackend, rate_limiter
+    from .user_cache import user_loader
+
+    if isinstance(response_cache.backend, LRUCache):
+        response_cache.backend.clear()
+    user_loader.cache.clear()
+    perf_instrumentation.reset()
+    if isinstance(rate_limiter.backend, MemoryRateLimitBackend):
+        rate_limiter.backend.clear()
+
+def prepare_preload(app):
+    """Get a fully loaded app ready to be forked into workers (gunicorn --preload).
+
+    Warms the app up, then closes the parent's pooled connections, since a
+    connection shared by two processes corrupts its protocol stream. Each
+    child additionally drops whatever the parent's pools hold at fork time
+    (dispose(close=False) leaves the parent's sockets alone), so workers
+    always open their own connections. The long-lived objects are moved
+    out of the garbage collector's reach (gc.freeze) so collections in the
+    workers don't touch, and thereby copy, the shared memory pages.
+    """
+    warm_up(app)
+    _reset_process_state(app)
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        engine.dispose()
+
+    def _after_fork_in_child():
+        for engine in engines:
+            engine.dispose(close=False)
+
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+    gc.freeze()
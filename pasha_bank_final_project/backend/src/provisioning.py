@@ -0,0 +1,110 @@
+from datetime import datetime
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from . import db
+from .models import User, UserRole
+from .passwords import password_hasher
+
+users = User.__table__
+
+def _existing(usernames, emails):
+    """Usernames and emails from the given sets that are already taken, casefolded.
+
+    MySQL's unique indexes compare case-insensitively, so "Alice" takes
+    "alice" too; callers compare casefolded keys against these.
+    """
+    if not usernames and not emails:
+        return set(), set()
+    rows = db.session.execute(
+        select(users.c.username, users.c.email)
+        .where(or_(users.c.username.in_(usernames), users.c.email.in_(emails)))
+    ).all()
+    return {r.username.casefold() for r in rows}, {r.email.casefold() for r in rows}
+
+def _insert_one_by_one(candidates):
+    # Last resort after the chunk lost a race twice: find the conflicting rows
+    for result, row in candidates:
+        try:
+            db.session.execute(insert(users), [row])
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            result.update(status="skipped", message="Username or email already exists")
+        else:
+            result.update(status="created")
+
+def provision_users(records, seen_usernames, seen_emails):
+    """Create users from a chunk of import records and commit them.
+
+    Duplicates are detected in bulk, ignoring case like the unique indexes:
+    against the whole import so far (`seen_usernames`/`seen_emails`,
+    casefolded, updated in place) and against the users table with one
+    SELECT per chunk. Passwords are hashed across the password hasher's
+    process pool, then the chunk is inserted with one executemany in its
+    own transaction. If a concurrent registration wins a race on the unique
+    constraints, the chunk is re-checked and retried once, then inserted
+    row by row so only the conflicting rows are skipped.
+
+    Returns one result dict per record (status created, skipped or rejected).
+    """
+    results = []
+    candidates = []
+    for index, record in enumerate(records):
+        username = (record.get("username") or "").strip()
+        email = (record.get("email") or "").strip()
+        result = {"index": index, "username": username}
+        results.append(result)
+        if not username or not email or not record.get("password"):
+            result.update(status="rejected", message="Missing username, email, or password")
+            continue
+        try:
+            role = UserRole(record.get("role") or UserRole.INVESTOR.value)
+        except ValueError:
+            result.update(status="rejected", message=f"Invalid role: {record.get('role')}")
+            continue
+        if username.casefold() in seen_usernames or email.casefold() in seen_emails:
+            result.update(status="skipped", message="Duplicate username or email in import")
+            continue
+        seen_usernames.add(username.casefold())
+        seen_emails.add(email.casefold())
+        candidates.append((result, {
+            "username": username,
+            "email": email,
+            "full_name": record.get("full_name") or None,
+            "role": role,
+            "password": record["password"],
+        }))
+
+    for attempt in range(2):
+        taken_usernames, taken_emails = _existing(
+            {row["username"] for _, row in candidates}, {row["email"] for _, row in candidates}
+        )
+        fresh = []
+        for result, row in candidates:
+            if row["username"].casefold() in taken_usernames or row["email"].casefold() in taken_emails:
+                result.update(status="skipped", message="Username or email already exists")
+            else:
+                fresh.append((result, row))
+        candidates = fresh
+        if not candidates:
+            return results
+
+        if attempt == 0:
+            hashes = password_hasher.hash_many([row.pop("password") for _, row in candidates])
+            now = datetime.utcnow()
+            for (_, row), password_hash in zip(candidates, hashes):
+                row.update(password_hash=password_hash, created_at=now, updated_at=now)
+        try:
+            db.session.execute(insert(users), [row for _, row in candidates])
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            if attempt == 1:
+                _insert_one_by_one(candidates)
+                return results
+            continue
+        for result, _ in candidates:
+            result.update(status="created")
+        return results
+    return results
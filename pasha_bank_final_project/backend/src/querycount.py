@@ -0,0 +1,41 @@
+import contextlib
+import threading
+from sqlalchemy import event
+
+# Maximum number of SQL statements each public endpoint may issue for a
+# single request, keyed by Flask endpoint name. The counts must not grow
+# with the number of rows returned (no lazy loads inside serializers).
+QUERY_BUDGETS = {
+    "projects.get_projects": 1,          # requested columns (JOIN users only for owner_username)
+    "projects.get_project_details": 2,   # same, for a single project (+ updates for the old SPA bundle)
+    "projects.get_project_updates": 2,   # one page of updates (+ project check if empty)
+    "projects.get_project_stats": 1,     # stats columns of one project row
+    "projects.search_projects": 1,       # index lookup joined to the requested columns
+}
+
+class QueryCounter:
+    """Collects the SQL statements executed on an engine."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+@contextlib.contextmanager
+def count_queries(engine, this_thread_only=False):
+    """Count the statements sent to `engine` while the block runs
+    (only those sent from the calling thread with `this_thread_only`)."""
+    counter = QueryCounter()
+    thread_id = threading.get_ident()
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not this_thread_only or threading.get_ident() == thread_id:
+            counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
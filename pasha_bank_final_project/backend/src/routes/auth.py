@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from werkzeug.security import check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, current_user
 
 from ..models import User, UserRole
 from .. import db
@@ -51,6 +51,15 @@ def login():
     user = User.query.filter_by(username=username).first()
 
     if user and user.check_password(password):
+        if user.password_needs_rehash():
+            # Hashing parameters changed since this hash was made; upgrade it
+            # while we have the plaintext. Best effort, login succeeds anyway.
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+
         # --- MODIFICATION START ---
         # Use user.id (as a string) for the identity
         # Ensure user.id is converted to string if it's an integer,
@@ -76,13 +85,8 @@ def login():
 @auth_bp.route("/me", methods=["GET"])
 @jwt_required()
 def get_current_user():
-    # current_user_identity = get_jwt_identity()
-    user_id = int(get_jwt_identity())
-    # user_id = int(user_id)
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
+    # Resolved by the cached JWT user loader (user_cache.py), no query here
+    user = current_user
 
     return jsonify({
         "id": user.id,
@@ -92,4 +96,3 @@ def get_current_user():
         "role": user.role.value,
         "created_at": user.created_at.isoformat()
     }), 200
-
@@ -0,0 +1,14 @@
+from flask import Blueprint, jsonify
+from .. import db
+from ..database import pool_stats
+
+health_bp = Blueprint("health", __name__)
+
+@health_bp.route("", methods=["GET"])
+def health_check():
+    return jsonify({"status": "healthy"}), 200
+
+@health_bp.route("/pool", methods=["GET"])
+def get_pool_stats():
+    """Connection pool usage of this worker process, per database bind."""
+    return jsonify(pool_stats(db.engines)), 200
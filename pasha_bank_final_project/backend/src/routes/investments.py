@@ -1,29 +1,60 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models import Investment, Project, User, InvestmentStatus, ProjectStatus
+from flask_jwt_extended import jwt_required, current_user
+from ..models import Investment, Project, User, InvestmentStatus, ProjectStatus, UserRole
 from .. import db
+from ..archive import investment_history
+from ..cache import invalidate_investors, invalidate_project, investor_namespace, response_cache
+from ..database import read_only
+from ..export import EXPORT_FORMATS, export_response
+from ..ledger import MAX_BATCH_SIZE, apply_investment, ingest_investments
+from ..notifications import PROJECT_FUNDED, enqueue_event
+from datetime import datetime
+from sqlalchemy import extract, func, select
 from decimal import Decimal
 
 investments_bp = Blueprint("investments", __name__)
 
 # Helper function to serialize investment data
 def serialize_investment(investment):
+    return investment_dict(investment, investment.project.title)
+
+def investment_dict(investment, project_title):
+    """Investment fields from an ORM object or an investment_columns row (raw values, see FastJSONProvider)."""
     return {
         "id": investment.id,
         "user_id": investment.user_id,
         "project_id": investment.project_id,
-        "project_title": investment.project.title, # Include project title
-        "amount": str(investment.amount), # Convert Decimal to string
-        "status": investment.status.value,
-        "invested_at": investment.invested_at.isoformat()
+        "project_title": project_title, # Include project title
+        "amount": investment.amount,
+        "status": investment.status,
+        "invested_at": investment.invested_at
     }
 
+def investment_columns(history):
+    """Columns for investment listings from an investment_history subquery,
+    joined to the project title in one SELECT."""
+    return (
+        history.c.id, history.c.user_id, history.c.project_id, history.c.amount,
+        history.c.status, history.c.invested_at, Project.title.label("project_title"),
+    )
+
+HISTORY_CHOICES = ("recent", "full")
+
+def full_history_requested():
+    """?history=full includes archived investments (projects closed long
+    ago, see archive.py); the default "recent" reads the hot table only.
+    None if the value is invalid."""
+    history = request.args.get("history", default="recent", type=str)
+    return history == "full" if history in HISTORY_CHOICES else None
+
+def invalid_history_response():
+    return jsonify({"message": f"Invalid history. Valid values are: {', '.join(HISTORY_CHOICES)}"}), 400
+
 @investments_bp.route("/project/<int:project_id>", methods=["POST"])
 @jwt_required()
 def make_investment(project_id):
     """Make an investment in a specific project."""
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
+    user_id = current_user.id
 
     project = Project.query.get_or_404(project_id)
 
@@ -48,40 +79,191 @@ def make_investment(project_id):
         return jsonify({"message": "Invalid investment amount"}), 400
 
     # Create the investment record (initially pending, or directly confirmed if payment is integrated)
+    invested_at = datetime.utcnow()
     new_investment = Investment(
         user_id=user_id,
         project_id=project_id,
         amount=amount,
-        status=InvestmentStatus.CONFIRMED # Assume confirmed for now, adjust if payment flow needed
+        status=InvestmentStatus.CONFIRMED, # Assume confirmed for now, adjust if payment flow needed
+        invested_at=invested_at
     )
 
-    # Update project's current amount
-    project.current_amount += amount
-
-    # Optional: Check if goal reached and update project status
-    if project.current_amount >= project.goal_amount:
-        project.status = ProjectStatus.SUCCESSFUL
-        # Potentially trigger notifications here
-
     try:
+        # Increment the total and flip to SUCCESSFUL in one conditional UPDATE,
+        # so concurrent investors cannot overwrite each other's amounts. It runs
+        # before the INSERT so the project row lock is taken first (the FK check
+        # on the insert would otherwise take a shared lock and risk deadlocks).
+        applied, reached_goal = apply_investment(project_id, amount, invested_at, investor_id=user_id)
+        if not applied:
+            # Another investment completed (or closed) the project after our check
+            db.session.rollback()
+            return jsonify({"message": "Project is not currently accepting investments"}), 400
+        if reached_goal:
+            # Every investor is notified by the notification worker
+            enqueue_event(PROJECT_FUNDED, project_id)
         db.session.add(new_investment)
-        # The project object was already tracked by the session, so changes are staged
         db.session.commit()
+        invalidate_project(project_id)
+        invalidate_investors(user_id)
         return jsonify(serialize_investment(new_investment)), 201
     except Exception as e:
         db.session.rollback()
         # Log error e
         return jsonify({"message": "Failed to process investment"}), 500
 
+@investments_bp.route("/batch", methods=["POST"])
+@jwt_required()
+def ingest_investment_batch():
+    """Record a batch of settled investments from a bank channel (admin only)."""
+    if current_user.role != UserRole.ADMIN:
+        return jsonify({"message": "Only admins can import investments"}), 403
+
+    data = request.get_json()
+    items = data.get("investments") if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({"message": "Expected a non-empty 'investments' list"}), 400
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({"message": f"Batch too large, at most {MAX_BATCH_SIZE} investments per request"}), 413
+
+    try:
+        results, completed = ingest_investments(items)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        # Log error e
+        return jsonify({"message": "Failed to process investment batch"}), 500
+
+    accepted_items = [items[r["index"]] for r in results if r["status"] == "accepted"]
+    for project_id in {int(item["project_id"]) for item in accepted_items}:
+        invalidate_project(project_id)
+    invalidate_investors(*{int(item["user_id"]) for item in accepted_items})
+    accepted = len(accepted_items)
+    return jsonify({
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results,
+    }), 200
+
 @investments_bp.route("/my", methods=["GET"])
 @jwt_required()
+@read_only
 def get_my_investments():
-    """Get all investments made by the current user."""
-    user_id = int(get_jwt_identity())
+    """Get all investments made by the current user (?history=full includes archived ones)."""
+    user_id = current_user.id
+    full_history = full_history_requested()
+    if full_history is None:
+        return invalid_history_response()
+    history = investment_history(full_history, where=lambda t: t.c.user_id == user_id)
     try:
-        investments = Investment.query.filter_by(user_id=user_id).order_by(Investment.invested_at.desc()).all()
-        return jsonify([serialize_investment(inv) for inv in investments]), 200
+        investments = db.session.execute(
+            select(*investment_columns(history))
+            .join(Project, history.c.project_id == Project.id)
+            .order_by(history.c.invested_at.desc())
+        )
+        return jsonify([investment_dict(inv, inv.project_title) for inv in investments]), 200
     except Exception as e:
         # Log error e
         return jsonify({"message": "Failed to retrieve investments"}), 500
 
+def _portfolio_totals(history, *group_by):
+    """Investment count and total of a portfolio (an investment_history of
+    its non-failed investments), one row per group_by value."""
+    return db.session.execute(
+        select(*group_by, func.count().label("count"), func.sum(history.c.amount).label("total"))
+        .select_from(history)
+        .join(Project, history.c.project_id == Project.id)
+        .group_by(*group_by)
+        .order_by(*group_by)
+    ).all()
+
+@investments_bp.route("/my/summary", methods=["GET"])
+@jwt_required()
+@response_cache.cached(lambda **_: investor_namespace(current_user.id), private=True)
+@read_only
+def get_my_investment_summary():
+    """Totals of the current user's investments by category, project status and month.
+
+    Aggregated in the database (GROUP BY), so the cost doesn't depend on how
+    many investments the user has. Failed investments are left out. Cached
+    until the user invests again; project status changes show up once the
+    cache entry expires (RESPONSE_CACHE_TTL). ?history=full includes
+    archived investments.
+    """
+    user_id = current_user.id
+    full_history = full_history_requested()
+    if full_history is None:
+        return invalid_history_response()
+    history = investment_history(
+        full_history, where=lambda t: (t.c.user_id == user_id) & (t.c.status != InvestmentStatus.FAILED)
+    )
+    year, month = extract("year", history.c.invested_at), extract("month", history.c.invested_at)
+    try:
+        by_category = _portfolio_totals(history, Project.category)
+        by_status = _portfolio_totals(history, Project.status)
+        by_month = _portfolio_totals(history, year.label("year"), month.label("month"))
+        project_count = db.session.execute(select(func.count(history.c.project_id.distinct()))).scalar()
+    except Exception as e:
+        # Log error e
+        return jsonify({"message": "Failed to retrieve investment summary"}), 500
+
+    return jsonify({
+        "total_invested": sum((row.total for row in by_status), Decimal("0.00")),
+        "investment_count": sum(row.count for row in by_status),
+        "project_count": project_count,
+        "by_category": [{"category": row.category, "count": row.count, "total": row.total} for row in by_category],
+        "by_status": [{"status": row.status, "count": row.count, "total": row.total} for row in by_status],
+        "by_month": [{"month": f"{int(row.year):04d}-{int(row.month):02d}", "count": row.count, "total": row.total} for row in by_month],
+    }), 200
+
+def export_format():
+    """The ?format= of an export request (ndjson or csv), or None if invalid."""
+    fmt = request.args.get("format", default="ndjson", type=str)
+    return fmt if fmt in EXPORT_FORMATS else None
+
+@investments_bp.route("/my/export", methods=["GET"])
+@jwt_required()
+@read_only
+def export_my_investments():
+    """Stream all of the current user's investments as NDJSON or CSV (?format=, ?history=)."""
+    fmt = export_format()
+    if fmt is None:
+        return jsonify({"message": f"Invalid format. Valid formats are: {', '.join(EXPORT_FORMATS)}"}), 400
+    full_history = full_history_requested()
+    if full_history is None:
+        return invalid_history_response()
+    user_id = current_user.id
+    history = investment_history(full_history, where=lambda t: t.c.user_id == user_id)
+    statement = (
+        select(*investment_columns(history))
+        .join(Project, history.c.project_id == Project.id)
+        .order_by(history.c.invested_at.desc())
+    )
+    return export_response(statement, fmt, "my-investments")
+
+@investments_bp.route("/project/<int:project_id>/export", methods=["GET"])
+@jwt_required()
+@read_only
+def export_project_investments(project_id):
+    """Stream every investment in a project for reconciliation (project owner or admin).
+
+    ?history=full includes archived investments, for projects closed long ago.
+    """
+    fmt = export_format()
+    if fmt is None:
+        return jsonify({"message": f"Invalid format. Valid formats are: {', '.join(EXPORT_FORMATS)}"}), 400
+    full_history = full_history_requested()
+    if full_history is None:
+        return invalid_history_response()
+    owner_id = db.first_or_404(select(Project.owner_id).where(Project.id == project_id))
+    if current_user.id != owner_id and current_user.role != UserRole.ADMIN:
+        return jsonify({"message": "Only the project owner or an admin can export its investments"}), 403
+    history = investment_history(full_history, where=lambda t: t.c.project_id == project_id)
+    statement = (
+        select(
+            history.c.id, history.c.user_id, User.username.label("investor_username"),
+            history.c.amount, history.c.status, history.c.invested_at,
+        )
+        .join(User, history.c.user_id == User.id)
+        .order_by(history.c.id)
+    )
+    return export_response(statement, fmt, f"project-{project_id}-investments")
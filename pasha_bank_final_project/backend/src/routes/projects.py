@@ -1,74 +1,488 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from ..models import Project, User, ProjectStatus, ProjectUpdate # Added ProjectUpdate
+from flask import Blueprint, abort, request, jsonify, url_for
+from flask_jwt_extended import jwt_required, current_user
+import itertools
+from operator import attrgetter
+from sqlalchemy import and_, func, or_, select
+from ..models import Project, User, ProjectStatus, ProjectUpdate, FundingBucket, ProjectFundingRollup, UserRole
 from .. import db
-from datetime import datetime # Added datetime import
+from ..cache import response_cache
+from ..database import read_only
+from ..ledger import bucket_start
+from ..notifications import PROJECT_UPDATE_POSTED, enqueue_event
+from ..pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, keyset_filter, page_size
+from ..search import SNIPPET_LENGTH, apply_search, highlight, search_terms
+from datetime import date, datetime, timedelta, timezone # Added datetime import
 from decimal import Decimal # Added Decimal import
 
 projects_bp = Blueprint("projects", __name__)
 
+def _column(name):
+    return (getattr(Project, name),), attrgetter(name)
+
+def average_investment(project):
+    if project.investment_count:
+        return (project.current_amount / project.investment_count).quantize(Decimal("0.01"))
+    return Decimal("0.00")
+
+# Public field name -> (columns it needs, how to read it from a row or a Project).
+# Values are passed through as loaded (Decimal, date, enum); the app's JSON
+# provider renders them as strings, ISO dates and enum values.
+PROJECT_FIELDS = {
+    "id": _column("id"),
+    "title": _column("title"),
+    "description": _column("description"),
+    "category": _column("category"),
+    "image_url": _column("image_url"),
+    "goal_amount": _column("goal_amount"),
+    "current_amount": _column("current_amount"),
+    "funding_progress": _column("funding_progress"),
+    "status": _column("status"),
+    "start_date": _column("start_date"),
+    "end_date": _column("end_date"),
+    "owner_id": _column("owner_id"),
+    "owner_username": ((User.username.label("owner_username"),), attrgetter("owner_username")),
+    "created_at": _column("created_at"),
+    "updated_at": _column("updated_at"),
+    "investor_count": _column("investor_count"),
+    "investment_count": _column("investment_count"),
+    "average_investment": ((Project.current_amount, Project.investment_count), average_investment),
+    "last_investment_at": ((Project.last_invested_at,), attrgetter("last_invested_at")),
+}
+
+# Named representations for ?view=; lists default to the card-sized summary
+PROJECT_VIEWS = {
+    "summary": ("id", "title", "category", "image_url", "goal_amount", "current_amount", "funding_progress", "status", "end_date"),
+    "full": tuple(PROJECT_FIELDS),
+}
+
+def requested_fields(default_view, args=None):
+    """Fields to render, from ?fields=a,b (sparse fieldset) or ?view=summary|full.
+
+    Reads the current request's arguments unless `args` (a MultiDict) is
+    given. Raises ValueError with a client-facing message for unknown names.
+    """
+    args = request.args if args is None else args
+    fields = args.get("fields")
+    if fields:
+        names = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in PROJECT_FIELDS]
+        if unknown or not names:
+            raise ValueError(f"Invalid fields: {', '.join(unknown)}. Valid fields are: {', '.join(PROJECT_FIELDS)}")
+        return names
+    view = args.get("view", default=default_view, type=str)
+    if view not in PROJECT_VIEWS:
+        raise ValueError(f"Invalid view: {view}. Valid views are: {', '.join(PROJECT_VIEWS)}")
+    return PROJECT_VIEWS[view]
+
+def project_select(fields, *extra_columns):
+    """SELECT of only the columns `fields` need (plus `extra_columns`), as plain rows."""
+    columns = {}
+    for column in itertools.chain(*(PROJECT_FIELDS[name][0] for name in fields), extra_columns):
+        columns.setdefault(column.key, column)
+    query = select(*columns.values())
+    if "owner_username" in fields:
+        query = query.join(User, Project.owner_id == User.id)
+    return query
+
+def project_dict(project, fields):
+    """The given fields of a project_select row or a Project object."""
+    return {name: PROJECT_FIELDS[name][1](project) for name in fields}
+
 # Helper function to serialize project data
 def serialize_project(project):
+    return project_dict(project, PROJECT_VIEWS["full"])
+
+def serialize_funding_stats(project):
+    """Funding stats for a project (or any row with the stats columns)."""
     return {
-        "id": project.id,
-        "title": project.title,
-        "description": project.description,
-        "category": project.category,
-        "image_url": project.image_url,
-        "goal_amount": str(project.goal_amount), # Convert Decimal to string
-        "current_amount": str(project.current_amount),
-        "status": project.status.value,
-        "start_date": project.start_date.isoformat() if project.start_date else None,
-        "end_date": project.end_date.isoformat() if project.end_date else None,
-        "owner_id": project.owner_id,
-        "owner_username": project.owner.username, # Include owner username
-        "created_at": project.created_at.isoformat(),
-        "updated_at": project.updated_at.isoformat(),
-        "updates": [serialize_update(up) for up in project.updates] # Include updates
+        "investor_count": project.investor_count,
+        "investment_count": project.investment_count,
+        "average_investment": average_investment(project),
+        "last_investment_at": project.last_invested_at,
+    }
+
+def project_stats_select(project_id):
+    return select(
+        Project.id,
+        Project.goal_amount,
+        Project.current_amount,
+        Project.investment_count,
+        Project.investor_count,
+        Project.last_invested_at,
+    ).where(Project.id == project_id)
+
+def serialize_project_stats(row):
+    """Body of get_project_stats, from a project_stats_select row."""
+    return {
+        "project_id": row.id,
+        "goal_amount": row.goal_amount,
+        "total_invested": row.current_amount,
+        **serialize_funding_stats(row),
     }
 
 def serialize_update(update):
     return {
         "id": update.id,
         "update_text": update.update_text,
-        "created_at": update.created_at.isoformat()
+        "created_at": update.created_at
     }
 
-@projects_bp.route("", methods=["GET"])
-def get_projects():
-    """Get a list of all projects (or filter by status, e.g., only funding)."""
-    # Add filtering/pagination later if needed
-    status_filter = request.args.get("status", default=ProjectStatus.FUNDING.value, type=str)
+def wants_legacy_updates(args):
+    """Whether a details request should still embed `updates`.
+
+    The SPA bundle committed in static/ predates get_project_updates and
+    renders the `updates` of GET /api/projects/<id>, requested without
+    ?view= or ?fields=. Until it is rebuilt from frontend/ (which asks for
+    ?view=full), such requests get the newest MAX_PAGE_SIZE updates too.
+    """
+    return "view" not in args and "fields" not in args
+
+def legacy_updates_select(project_id):
+    return (
+        select(ProjectUpdate.id, ProjectUpdate.update_text, ProjectUpdate.created_at)
+        .where(ProjectUpdate.project_id == project_id)
+        .order_by(ProjectUpdate.created_at.desc(), ProjectUpdate.id.desc())
+        .limit(MAX_PAGE_SIZE)
+    )
+
+# ?sort= value -> (ordering column, descending, parser for the cursor value)
+PROJECT_SORTS = {
+    "newest": (Project.created_at, True, datetime.fromisoformat),
+    "closest_to_goal": (Project.funding_progress, True, Decimal),
+    "ending_soon": (Project.end_date, False, date.fromisoformat),
+}
+
+def catalogue_query(args):
+    """The catalogue SELECT for get_projects' query arguments (a MultiDict).
+
+    Returns (query, fields, sort, limit); the query fetches one row more
+    than `limit`, see next_catalogue_cursor. Raises ValueError with a
+    client-facing message for invalid arguments.
+    """
+    status_filter = args.get("status", default=ProjectStatus.FUNDING.value, type=str)
+    category = args.get("category", type=str)
+    sort = args.get("sort", default="newest", type=str)
+    limit = page_size(args.get("limit", type=int))
+    cursor = args.get("cursor")
+
     try:
         # Ensure the status value is valid before querying
         valid_status = ProjectStatus(status_filter)
-        projects = Project.query.filter(Project.status == valid_status).order_by(Project.created_at.desc()).all()
-        return jsonify([serialize_project(p) for p in projects]), 200
     except ValueError:
-         # Handle invalid status value gracefully by defaulting to FUNDING
-         projects = Project.query.filter(Project.status == ProjectStatus.FUNDING).order_by(Project.created_at.desc()).all()
-         return jsonify([serialize_project(p) for p in projects]), 200
+        # Handle invalid status value gracefully by defaulting to FUNDING
+        valid_status = ProjectStatus.FUNDING
+
+    if sort not in PROJECT_SORTS:
+        raise ValueError(f"Invalid sort: {sort}. Valid sorts are: {', '.join(PROJECT_SORTS)}")
+    sort_column, descending, parse_value = PROJECT_SORTS[sort]
+    fields = requested_fields("summary", args)
+
+    # id and the sort column are needed for the cursor even if not requested
+    query = project_select(fields, Project.id, sort_column).where(Project.status == valid_status)
+    if category:
+        query = query.where(Project.category == category)
+    if sort == "ending_soon":
+        # Open-ended projects never end, so they have no place in this ordering
+        query = query.where(Project.end_date.isnot(None))
+    if cursor:
+        try:
+            value, last_id = decode_cursor(cursor, sort)
+            query = query.where(keyset_filter(sort_column, Project.id, parse_value(value), last_id, descending))
+        except (ValueError, TypeError, ArithmeticError):
+            raise ValueError("Invalid cursor") from None
+
+    if descending:
+        query = query.order_by(sort_column.desc(), Project.id.desc())
+    else:
+        query = query.order_by(sort_column.asc(), Project.id.asc())
+    # One extra row tells us whether there is a next page
+    return query.limit(limit + 1), fields, sort, limit
+
+def next_catalogue_cursor(projects, sort, limit):
+    """Cursor for the page after `projects` (a catalogue_query result), None on the last page."""
+    if len(projects) <= limit:
+        return None
+    last = projects[limit - 1]
+    last_value = getattr(last, PROJECT_SORTS[sort][0].key)
+    return encode_cursor(sort, last_value.isoformat() if hasattr(last_value, "isoformat") else str(last_value), last.id)
+
+@projects_bp.route("", methods=["GET"])
+@response_cache.cached("projects")
+@read_only
+def get_projects():
+    """List projects page by page, filtered by status/category and sorted.
+
+    Uses keyset pagination: the X-Next-Cursor response header holds the
+    position after the last row, pass it back as ?cursor= for the next page.
+    """
+    try:
+        query, fields, sort, limit = catalogue_query(request.args)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    try:
+        projects = db.session.execute(query).all()
     except Exception as e:
         # Log error e
         print(f"Error fetching projects: {e}") # Basic logging
         return jsonify({"message": "Failed to retrieve projects"}), 500
 
+    response = jsonify([project_dict(p, fields) for p in projects[:limit]])
+    next_cursor = next_catalogue_cursor(projects, sort, limit)
+    if next_cursor:
+        next_url = url_for("projects.get_projects", **{**request.args.to_dict(), "cursor": next_cursor})
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response, 200
+
+@projects_bp.route("/search", methods=["GET"])
+@response_cache.cached("projects")
+@read_only
+def search_projects():
+    """Full-text search over title, description and category, best matches first.
+
+    ?q= is required, ?status= filters (default: every status but draft) and
+    ?fields=/?view= pick the fields as in get_projects. Each result also
+    carries its relevance `score` and `highlights`: the title and a
+    description snippet, HTML-escaped, with matching words in <mark>.
+    Further pages via the X-Next-Cursor header.
+    """
+    terms = search_terms(request.args.get("q"))
+    if not terms:
+        return jsonify({"message": "Missing search query: q"}), 400
+    limit = page_size(request.args.get("limit", type=int))
+    cursor = request.args.get("cursor")
+    status_filter = request.args.get("status", type=str)
+
+    status = None
+    if status_filter:
+        try:
+            status = ProjectStatus(status_filter)
+        except ValueError:
+            return jsonify({"message": f"Invalid status: {status_filter}"}), 400
+    try:
+        fields = requested_fields("summary")
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    offset = 0
+    if cursor:
+        try:
+            offset, _ = decode_cursor(cursor, "search")
+            offset = int(offset)
+        except (ValueError, TypeError):
+            return jsonify({"message": "Invalid cursor"}), 400
+        if offset < 0:
+            return jsonify({"message": "Invalid cursor"}), 400
+
+    query, score = apply_search(project_select(fields, Project.id, Project.title, Project.description), terms)
+    if status is not None:
+        query = query.where(Project.status == status)
+    else:
+        query = query.where(Project.status != ProjectStatus.DRAFT)
+    # Relevance order can't be keyset-paginated, so the cursor holds an offset
+    results = db.session.execute(query.order_by(score.desc(), Project.id.desc()).offset(offset).limit(limit + 1)).all()
+
+    response = jsonify([
+        {
+            **project_dict(row, fields),
+            "score": round(float(row.score), 6),
+            "highlights": {
+                "title": highlight(row.title, terms),
+                "description": highlight(row.description, terms, SNIPPET_LENGTH),
+            },
+        }
+        for row in results[:limit]
+    ])
+    if len(results) > limit:
+        next_cursor = encode_cursor("search", str(offset + limit), results[limit - 1].id)
+        next_url = url_for("projects.search_projects", **{**request.args.to_dict(), "cursor": next_cursor})
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response, 200
+
 @projects_bp.route("/<int:project_id>", methods=["GET"])
+@response_cache.cached("project:{project_id}")
+@read_only
 def get_project_details(project_id):
-    """Get details for a specific project."""
-    project = Project.query.get_or_404(project_id)
-    return jsonify(serialize_project(project)), 200
+    """Get details for a specific project (full view unless ?view= or ?fields= say otherwise).
+
+    Updates are listed separately, see get_project_updates (and
+    wants_legacy_updates for the old bundle's exception).
+    """
+    try:
+        fields = requested_fields("full")
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+    project = db.session.execute(project_select(fields, Project.id).where(Project.id == project_id)).first()
+    if project is None:
+        abort(404)
+    body = project_dict(project, fields)
+    if wants_legacy_updates(request.args):
+        body["updates"] = [serialize_update(update) for update in db.session.execute(legacy_updates_select(project_id))]
+    return jsonify(body), 200
+
+@projects_bp.route("/<int:project_id>/updates", methods=["GET"])
+@response_cache.cached("project:{project_id}")
+@read_only
+def get_project_updates(project_id):
+    """List a project's updates, newest first, with the same cursor paging as get_projects."""
+    limit = page_size(request.args.get("limit", type=int))
+    cursor = request.args.get("cursor")
+
+    query = select(ProjectUpdate.id, ProjectUpdate.update_text, ProjectUpdate.created_at).where(ProjectUpdate.project_id == project_id)
+    if cursor:
+        try:
+            value, last_id = decode_cursor(cursor, "updates")
+            query = query.where(keyset_filter(ProjectUpdate.created_at, ProjectUpdate.id, datetime.fromisoformat(value), last_id, True))
+        except (ValueError, TypeError):
+            return jsonify({"message": "Invalid cursor"}), 400
+    updates = db.session.execute(
+        query.order_by(ProjectUpdate.created_at.desc(), ProjectUpdate.id.desc()).limit(limit + 1)
+    ).all()
+    if not updates and not cursor:
+        # Only an empty first page needs to tell "no updates" from "no project"
+        db.first_or_404(select(Project.id).where(Project.id == project_id))
+
+    response = jsonify([serialize_update(update) for update in updates[:limit]])
+    if len(updates) > limit:
+        last = updates[limit - 1]
+        next_cursor = encode_cursor("updates", last.created_at.isoformat(), last.id)
+        next_url = url_for("projects.get_project_updates", project_id=project_id, **{**request.args.to_dict(), "cursor": next_cursor})
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response, 200
+
+@projects_bp.route("/<int:project_id>/updates", methods=["POST"])
+@jwt_required()
+def post_project_update(project_id):
+    """Post an update to a project (owner or admin); its investors are notified."""
+    owner_id = db.first_or_404(select(Project.owner_id).where(Project.id == project_id))
+    if current_user.id != owner_id and current_user.role != UserRole.ADMIN:
+        return jsonify({"message": "Only the project owner or an admin can post updates"}), 403
+
+    data = request.get_json()
+    update_text = (data.get("update_text") or "").strip() if isinstance(data, dict) else ""
+    if not update_text:
+        return jsonify({"message": "Missing required field: update_text"}), 400
+
+    update = ProjectUpdate(project_id=project_id, update_text=update_text)
+    try:
+        db.session.add(update)
+        db.session.flush()  # assigns update.id for the event
+        # Fanned out to every investor by the notification worker
+        enqueue_event(PROJECT_UPDATE_POSTED, project_id, {"update_id": update.id})
+        db.session.commit()
+        response_cache.invalidate(f"project:{project_id}")
+        return jsonify(serialize_update(update)), 201
+    except Exception as e:
+        db.session.rollback()
+        # Log error e
+        return jsonify({"message": "Failed to post update"}), 500
+
+@projects_bp.route("/<int:project_id>/stats", methods=["GET"])
+@response_cache.cached("project:{project_id}")
+@read_only
+def get_project_stats(project_id):
+    """Get funding stats for a project without loading the full project."""
+    row = db.session.execute(project_stats_select(project_id)).first()
+    if row is None:
+        abort(404)
+    return jsonify(serialize_project_stats(row)), 200
+
+# Range shown when ?from= is not given, and the most buckets one request may span
+TIMESERIES_DEFAULT_RANGE = {FundingBucket.HOUR: timedelta(days=2), FundingBucket.DAY: timedelta(days=90)}
+TIMESERIES_STEP = {FundingBucket.HOUR: timedelta(hours=1), FundingBucket.DAY: timedelta(days=1)}
+MAX_TIMESERIES_BUCKETS = 2000
+
+def parse_utc_datetime(value):
+    """ISO date or datetime as a naive UTC datetime, like the stored timestamps."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@projects_bp.route("/<int:project_id>/funding-timeseries", methods=["GET"])
+@jwt_required()
+@read_only
+def get_funding_timeseries(project_id):
+    """Funding over time for the project owner (or an admin), for charts.
+
+    ?bucket=hour|day (default day), ?from= and ?to= are ISO dates or
+    datetimes (UTC; default: the last 2 days of hours or 90 days of days).
+    Returns one point per bucket, empty buckets included, with the amount
+    and investment count in that bucket and the running total so far.
+    Reads the funding rollups, so the cost grows with the number of
+    buckets, not with the number of investments.
+    """
+    try:
+        bucket = FundingBucket(request.args.get("bucket", default="day", type=str))
+    except ValueError:
+        return jsonify({"message": f"Invalid bucket. Valid buckets are: {', '.join(b.value for b in FundingBucket)}"}), 400
+    try:
+        end = parse_utc_datetime(request.args["to"]) if "to" in request.args else datetime.utcnow()
+        start = parse_utc_datetime(request.args["from"]) if "from" in request.args else end - TIMESERIES_DEFAULT_RANGE[bucket]
+    except ValueError:
+        return jsonify({"message": "Invalid date format for from/to. Use ISO format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)."}), 400
+    step = TIMESERIES_STEP[bucket]
+    start, end = bucket_start(bucket, start), bucket_start(bucket, end)
+    if start > end:
+        return jsonify({"message": "from must not be after to"}), 400
+    if (end - start) // step + 1 > MAX_TIMESERIES_BUCKETS:
+        return jsonify({"message": f"Range too large, at most {MAX_TIMESERIES_BUCKETS} buckets per request"}), 400
+
+    owner_id = db.first_or_404(select(Project.owner_id).where(Project.id == project_id))
+    if current_user.id != owner_id and current_user.role != UserRole.ADMIN:
+        return jsonify({"message": "Only the project owner or an admin can view its funding history"}), 403
+
+    rollup = ProjectFundingRollup
+    rows = {
+        row.bucket_start: row for row in db.session.execute(
+            select(rollup.bucket_start, rollup.amount, rollup.investment_count)
+            .where(rollup.project_id == project_id, rollup.bucket == bucket, rollup.bucket_start.between(start, end))
+        )
+    }
+    # Everything raised before the range: whole days, plus the hours of a partial first day
+    start_day = bucket_start(FundingBucket.DAY, start)
+    total = db.session.execute(
+        select(func.coalesce(func.sum(rollup.amount), 0)).where(
+            rollup.project_id == project_id,
+            or_(
+                and_(rollup.bucket == FundingBucket.DAY, rollup.bucket_start < start_day),
+                and_(rollup.bucket == FundingBucket.HOUR, rollup.bucket_start >= start_day, rollup.bucket_start < start),
+            ),
+        )
+    ).scalar()
+    total = Decimal(total).quantize(Decimal("0.01"))
+
+    points = []
+    moment = start
+    while moment <= end:
+        row = rows.get(moment)
+        amount = row.amount if row is not None else Decimal("0.00")
+        total += amount
+        points.append({
+            "bucket_start": moment.isoformat(),
+            "amount": amount,
+            "investment_count": row.investment_count if row is not None else 0,
+            "cumulative_amount": total,
+        })
+        moment += step
+    return jsonify({
+        "project_id": project_id,
+        "bucket": bucket,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "points": points,
+    }), 200
 
 @projects_bp.route("", methods=["POST"])
 @jwt_required()
 def create_project():
     """Create a new project (requires authentication)."""
-    current_user_identity = get_jwt_identity()
-    user_id = current_user_identity["id"]
-    user = User.query.get(user_id)
+    user_id = current_user.id
 
     # Optional: Check if user has project_owner role
-    # if user.role != UserRole.PROJECT_OWNER:
+    # if current_user.role != UserRole.PROJECT_OWNER:
     #     return jsonify({"message": "Only project owners can create projects"}), 403
 
     data = request.get_json()
@@ -106,6 +520,7 @@ def create_project():
     try:
         db.session.add(new_project)
         db.session.commit()
+        response_cache.invalidate("projects")
         return jsonify(serialize_project(new_project)), 201
     except Exception as e:
         db.session.rollback()
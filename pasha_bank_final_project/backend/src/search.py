@@ -0,0 +1,67 @@
+import re
+
+from markupsafe import escape
+from sqlalchemy import column, func, literal_column, table
+from sqlalchemy.dialects.mysql import match
+
+from . import db
+from .models import Project
+
+MAX_SEARCH_TERMS = 8
+SNIPPET_LENGTH = 160
+
+# The FTS5 table created in models.py (SQLite only)
+projects_fts = table("projects_fts", column("rowid"))
+
+def search_terms(raw):
+    """Words of a user query, lowercased and deduplicated (query syntax is not exposed)."""
+    words = re.findall(r"\w+", (raw or "").lower())
+    return list(dict.fromkeys(words))[:MAX_SEARCH_TERMS]
+
+def apply_search(query, terms):
+    """Restrict a projects SELECT to matches of every term (as a prefix) and
+    add a `score` column, higher is more relevant.
+
+    Uses the FULLTEXT index on MySQL (boolean mode; words shorter than
+    innodb_ft_min_token_size or in the stopword list are ignored by MySQL)
+    and the FTS5 table on SQLite, ranked by BM25 with title matches
+    weighted highest.
+    """
+    if db.engine.dialect.name == "sqlite":
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        # bm25() is lower-is-better; weights are per column: title, description, category
+        score = -func.bm25(literal_column("projects_fts"), 10.0, 1.0, 5.0)
+        return (
+            query.join(projects_fts, projects_fts.c.rowid == Project.id)
+            .where(literal_column("projects_fts").op("MATCH")(fts_query))
+            .add_columns(score.label("score"))
+        ), score
+    score = match(Project.title, Project.description, Project.category, against=" ".join(f"+{term}*" for term in terms)).in_boolean_mode()
+    return query.where(score > 0).add_columns(score.label("score")), score
+
+def highlight(text, terms, snippet_length=None):
+    """HTML-escaped `text` with matching words wrapped in <mark>.
+
+    With `snippet_length`, only a window of about that many characters
+    around the first match is returned, with ellipses where it was cut.
+    """
+    if not text:
+        return text
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+    prefix = suffix = ""
+    if snippet_length is not None and len(text) > snippet_length:
+        first = pattern.search(text)
+        start = max(0, (first.start() if first else 0) - snippet_length // 4)
+        end = min(len(text), start + snippet_length)
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if end < len(text) else ""
+        text = text[start:end]
+
+    parts = []
+    position = 0
+    for found in pattern.finditer(text):
+        parts.append(str(escape(text[position:found.start()])))
+        parts.append(f"<mark>{escape(found.group())}</mark>")
+        position = found.end()
+    parts.append(str(escape(text[position:])))
+    return prefix + "".join(parts) + suffix
@@ -0,0 +1,157 @@
+import math
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from sqlalchemy import func, insert, select, update
+
+from . import db
+from .ledger import rebuild_funding_rollups, rebuild_project_stats
+from .models import Investment, InvestmentStatus, Project, ProjectStatus, ProjectUpdate, User, UserRole
+from .passwords import password_hasher
+
+# Every seeded account logs in with this password (hashed once, shared)
+SEED_PASSWORD = "password123"
+
+CATEGORIES = ["education", "health", "environment", "technology", "community", "culture", "sports", "agriculture"]
+WORDS = (
+    "community school clinic solar water garden library youth training local green village bridge "
+    "sports centre repair digital skills women farmers market clean energy heritage music park "
+    "support families build equipment renovation volunteers programme access safe future"
+).split()
+INSERT_CHUNK_SIZE = 1000
+
+def _zipf_weights(n, skew):
+    """Cumulative weights where rank r gets 1 / r**skew (a few items get most of the traffic)."""
+    return list(accumulate(1 / (rank ** skew) for rank in range(1, n + 1)))
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def _insert_chunked(table, rows):
+    for start in range(0, len(rows), INSERT_CHUNK_SIZE):
+        db.session.execute(insert(table), rows[start:start + INSERT_CHUNK_SIZE])
+
+def seed_dataset(users=2000, projects=500, investments=50000, updates_per_project=3, skew=1.1, seed=42):
+    """Fill an empty database with a realistic, reproducible dataset.
+
+    Investment volume follows a Zipf distribution over both projects and
+    investors (`skew` ~1 means a handful of hot campaigns and heavy
+    investors), amounts are log-normal, and project totals, statuses and
+    funding stats are derived from the generated ledger so the data is
+    consistent with what the API would have produced. Returns row counts.
+    """
+    if db.session.execute(select(func.count()).select_from(User.__table__)).scalar():
+        raise RuntimeError("seed_dataset expects an empty database")
+
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    password_hash = password_hasher.hash(SEED_PASSWORD)
+
+    user_rows = []
+    for user_id in range(1, users + 1):
+        if user_id == 1:
+            role = UserRole.ADMIN
+        elif user_id % 10 == 0:
+            role = UserRole.PROJECT_OWNER
+        else:
+            role = UserRole.INVESTOR
+        created_at = now - timedelta(days=rng.uniform(0, 730))
+        user_rows.append({
+            "id": user_id,
+            "username": f"user{user_id}",
+            "email": f"user{user_id}@example.com",
+            "password_hash": password_hash,
+            "full_name": f"Seed User {user_id}",
+            "role": role,
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    _insert_chunked(User.__table__, user_rows)
+    owner_ids = [row["id"] for row in user_rows if row["role"] == UserRole.PROJECT_OWNER] or [1]
+    investor_ids = [row["id"] for row in user_rows if row["role"] == UserRole.INVESTOR] or [1]
+
+    statuses = rng.choices(
+        [ProjectStatus.FUNDING, ProjectStatus.SUCCESSFUL, ProjectStatus.FAILED, ProjectStatus.DRAFT],
+        weights=[70, 15, 10, 5], k=projects,
+    )
+    project_rows = []
+    for project_id, status in enumerate(statuses, start=1):
+        created_at = now - timedelta(days=rng.uniform(1, 365))
+        start_date = created_at.date()
+        project_rows.append({
+            "id": project_id,
+            "title": _sentence(rng, rng.randint(3, 7))[:-1],
+            "description": " ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(3, 12))),
+            "category": rng.choice(CATEGORIES),
+            "image_url": f"https://picsum.photos/seed/{project_id}/640/360",
+            "goal_amount": Decimal(round(math.exp(rng.uniform(math.log(1000), math.log(100000))), -2)).quantize(Decimal("0.01")),
+            "current_amount": Decimal("0.00"),
+            "status": status,
+            "start_date": start_date,
+            "end_date": start_date + timedelta(days=rng.randint(30, 120)),
+            "owner_id": rng.choice(owner_ids),
+            "created_at": created_at,
+            "updated_at": created_at,
+        })
+    _insert_chunked(Project.__table__, project_rows)
+
+    investable = [row for row in project_rows if row["status"] != ProjectStatus.DRAFT]
+    rng.shuffle(investable)  # popularity rank independent of id
+    shuffled_investors = investor_ids[:]
+    rng.shuffle(shuffled_investors)
+    project_weights = _zipf_weights(len(investable), skew)
+    investor_weights = _zipf_weights(len(shuffled_investors), skew)
+    investment_rows = []
+    if investable:
+        chosen_projects = rng.choices(investable, cum_weights=project_weights, k=investments)
+        chosen_investors = rng.choices(shuffled_investors, cum_weights=investor_weights, k=investments)
+        for project, user_id in zip(chosen_projects, chosen_investors):
+            window = max(60.0, min((project["end_date"] - project["start_date"]).days * 86400.0, (now - project["created_at"]).total_seconds()))
+            amount = Decimal(min(max(math.exp(rng.gauss(math.log(150), 1.0)), 5), 20000)).quantize(Decimal("0.01"))
+            investment_rows.append({
+                "user_id": user_id,
+                "project_id": project["id"],
+                "amount": amount,
+                "status": InvestmentStatus.CONFIRMED,
+                "invested_at": project["created_at"] + timedelta(seconds=rng.uniform(0, window)),
+            })
+    _insert_chunked(Investment.__table__, investment_rows)
+
+    update_rows = []
+    for project in project_rows:
+        for _ in range(rng.randint(0, updates_per_project * 2)):
+            update_rows.append({
+                "project_id": project["id"],
+                "update_text": " ".join(_sentence(rng, rng.randint(6, 16)) for _ in range(rng.randint(1, 4))),
+                "created_at": project["created_at"] + timedelta(days=rng.uniform(0, 30)),
+            })
+    _insert_chunked(ProjectUpdate.__table__, update_rows)
+
+    # Derive totals and statuses from the ledger we just wrote
+    projects_table = Project.__table__
+    investments_table = Investment.__table__
+    db.session.execute(update(projects_table).values(current_amount=func.coalesce(
+        select(func.sum(investments_table.c.amount))
+        .where(investments_table.c.project_id == projects_table.c.id)
+        .scalar_subquery(), 0,
+    )))
+    db.session.execute(
+        update(projects_table)
+        .where(projects_table.c.status == ProjectStatus.FUNDING, projects_table.c.current_amount >= projects_table.c.goal_amount)
+        .values(status=ProjectStatus.SUCCESSFUL)
+    )
+    db.session.execute(
+        update(projects_table)
+        .where(projects_table.c.status == ProjectStatus.SUCCESSFUL, projects_table.c.current_amount < projects_table.c.goal_amount)
+        .values(status=ProjectStatus.FAILED)
+    )
+    rebuild_project_stats()
+    db.session.commit()
+    rebuild_funding_rollups()
+    return {
+        "users": len(user_rows),
+        "projects": len(project_rows),
+        "investments": len(investment_rows),
+        "project_updates": len(update_rows),
+    }
@@ -0,0 +1,108 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+
+from flask import request
+from werkzeug.exceptions import NotFound
+
+try:
+    import brotli  # Optional: enables br variants when installed
+except ImportError:
+    brotli = None
+
+# Vite emits content-hashed bundle names such as assets/index-BP17Dwgj.js
+FINGERPRINTED = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+MIN_COMPRESS_SIZE = 512
+
+class StaticAsset:
+    """One file of the SPA build with its precomputed encodings and headers."""
+
+    def __init__(self, path, body):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+        if FINGERPRINTED.match(path):
+            self.cache_control = "public, max-age=31536000, immutable"
+        else:
+            # index.html and unhashed files must be revalidated (cheap 304s)
+            self.cache_control = "no-cache"
+        self.variants = {"identity": body}
+
+    def add_variant(self, encoding, body):
+        # Only worth keeping when it actually saves bytes
+        if len(body) < len(self.variants["identity"]):
+            self.variants[encoding] = body
+
+class StaticManifest:
+    """In-memory manifest of the built frontend, created once at startup.
+
+    Every file under the static folder is read, hashed and compressed up
+    front, so serving an asset or the SPA shell performs no filesystem
+    calls. Fingerprinted bundles get immutable caching; everything else is
+    revalidated by ETag. Precompressed `.br`/`.gz` siblings produced by the
+    frontend build are used when present, otherwise gzip (and brotli, if the
+    package is installed) variants are generated here. Rebuilding the
+    frontend requires an app restart.
+    """
+
+    def __init__(self):
+        self.assets = {}
+
+    def build(self, root):
+        self.assets = {}
+        if not os.path.isdir(root):
+            logging.warning(f"Static folder not found, serving no frontend assets: {root}")
+            return self
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith((".br", ".gz")):
+                    continue
+                full_path = os.path.join(dirpath, filename)
+                path = os.path.relpath(full_path, root).replace(os.sep, "/")
+                with open(full_path, "rb") as f:
+                    asset = StaticAsset(path, f.read())
+                self._add_compressed_variants(asset, full_path)
+                self.assets[path] = asset
+        return self
+
+    @staticmethod
+    def _add_compressed_variants(asset, full_path):
+        body = asset.variants["identity"]
+        if len(body) < MIN_COMPRESS_SIZE or not asset.mimetype.startswith(COMPRESSIBLE_TYPES):
+            return
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if os.path.exists(full_path + suffix):
+                with open(full_path + suffix, "rb") as f:
+                    asset.add_variant(encoding, f.read())
+        if "gzip" not in asset.variants:
+            asset.add_variant("gzip", gzip.compress(body, compresslevel=9, mtime=0))
+        if "br" not in asset.variants and brotli is not None:
+            asset.add_variant("br", brotli.compress(body))
+
+    def response_for(self, path, response_class):
+        """Response for an asset path; unknown paths get the SPA shell (index.html)."""
+        asset = self.assets.get(path) if path else None
+        if asset is None:
+            asset = self.assets.get("index.html")
+            if asset is None:
+                logging.error("index.html not found in the static manifest")
+                raise NotFound()
+
+        encoding = "identity"
+        for candidate in ("br", "gzip"):
+            if candidate in asset.variants and candidate in request.accept_encodings:
+                encoding = candidate
+                break
+
+        response = response_class(asset.variants[encoding], mimetype=asset.mimetype)
+        response.set_etag(asset.etag if encoding == "identity" else f"{asset.etag}-{encoding}")
+        response.headers["Cache-Control"] = asset.cache_control
+        if len(asset.variants) > 1:
+            response.headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+        return response.make_conditional(request)
@@ -0,0 +1,244 @@
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import g, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+from .config import worker_threads
+
+# `rate` tokens per second refill a bucket of `burst`; one request takes one.
+# scope "user" keys on the JWT identity (the client IP when anonymous), "ip"
+# always on the client IP, e.g. for login where the user is not known yet.
+RateLimit = namedtuple("RateLimit", "rate burst scope")
+
+# Public catalogue reads are mostly served from the response cache, and one
+# anonymous IP may be a whole office or carrier NAT: only a loose cap against
+# scrapers (overload is the load shedder's job)
+PUBLIC_READ_LIMIT = RateLimit(100, 200, "user")
+
+DEFAULT_RATE_LIMITS = {
+    # every attempt costs a password hash
+    "auth.login": RateLimit(10 / 60, 10, "ip"),
+    "auth.register": RateLimit(5 / 60, 5, "ip"),
+    # each one is a write transaction holding a project row lock
+    "investments.make_investment": RateLimit(1, 5, "user"),
+    "investments.ingest_investment_batch": RateLimit(0.5, 2, "user"),
+    "projects.create_project": RateLimit(0.1, 5, "user"),
+    "projects.post_project_update": RateLimit(0.1, 5, "user"),
+    "projects.get_projects": PUBLIC_READ_LIMIT,
+    "projects.search_projects": PUBLIC_READ_LIMIT,
+    "projects.get_project_details": PUBLIC_READ_LIMIT,
+    "projects.get_project_updates": PUBLIC_READ_LIMIT,
+    "projects.get_project_stats": PUBLIC_READ_LIMIT,
+}
+DEFAULT_RATE_LIMIT = RateLimit(20, 50, "user")
+
+# Never throttled or shed: probes, scrapes and the SPA shell don't touch the database
+EXEMPT_ENDPOINTS = {"health.health_check", "health.get_pool_stats", "metrics", "serve_react_app", None}
+
+def _exempt():
+    return request.method == "OPTIONS" or request.endpoint in EXEMPT_ENDPOINTS
+
+def _retry_response(message, status, retry_after):
+    response = jsonify({"message": message})
+    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+    return response, status
+
+class RateLimitBackend:
+    """Token buckets keyed by string.
+
+    `consume` takes `cost` tokens from the bucket, which refills at `rate`
+    per second up to `burst`, and returns 0 if they were available or the
+    seconds until they will be. A shared backend must do this atomically
+    across processes.
+    """
+
+    def consume(self, key, rate, burst, cost=1):
+        raise NotImplementedError
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """In-process buckets; the default outside production.
+
+    Each worker process counts on its own, so with N workers a client may
+    get up to N times the configured rate (ProductionConfig uses redis). Buckets not touched for a while
+    are evicted first once `max_keys` is reached (they have refilled anyway).
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+# Refill and take in one step on the Redis server. The wait is returned as
+# a string because Redis truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= cost then tokens = tokens - cost else wait = (cost - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Buckets shared by every worker, in Redis.
+
+    Any redis-py compatible client that can run Lua scripts
+    (`register_script`) works, e.g. fakeredis with Lua support or a
+    Redis-protocol server on localhost for development.
+    """
+
+    def __init__(self, client, prefix="pasha:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, key, rate, burst, cost=1):
+        wait = self._script(keys=[self.prefix + key], args=[rate, burst, cost])
+        return float(wait.decode() if isinstance(wait, bytes) else wait)
+
+class RateLimiter:
+    """Per-client, per-endpoint token-bucket rate limiting.
+
+    Limits come from DEFAULT_RATE_LIMITS merged with RATE_LIMITS (endpoint
+    name -> RateLimit); other endpoints get RATE_LIMIT_DEFAULT (None to
+    leave them unlimited). Requests over the limit get a 429 with
+    Retry-After before the view runs. The client IP is request.remote_addr,
+    so behind a reverse proxy wrap the app in werkzeug's ProxyFix.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.limits = {}
+        self.default_limit = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RATE_LIMIT_ENABLED", True)
+        app.config.setdefault("RATE_LIMIT_BACKEND", "memory")  # memory | redis
+        app.config.setdefault("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+        app.config.setdefault("RATE_LIMITS", {})
+        app.config.setdefault("RATE_LIMIT_DEFAULT", DEFAULT_RATE_LIMIT)
+        app.extensions["rate_limiter"] = self
+        if not app.config["RATE_LIMIT_ENABLED"]:
+            return
+        self.backend = self._create_backend(app.config)
+        self.limits = {**DEFAULT_RATE_LIMITS, **app.config["RATE_LIMITS"]}
+        self.default_limit = app.config["RATE_LIMIT_DEFAULT"]
+        app.before_request(self._check)
+
+    @staticmethod
+    def _create_backend(config):
+        kind = config["RATE_LIMIT_BACKEND"]
+        if kind == "memory":
+            return MemoryRateLimitBackend()
+        if kind == "redis":
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from e
+            return RedisRateLimitBackend(redis.Redis.from_url(config["RATE_LIMIT_REDIS_URL"]))
+        raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {kind}")
+
+    @staticmethod
+    def _client_key(scope):
+        if scope == "user" and "Authorization" in request.headers:
+            try:
+                verify_jwt_in_request(optional=True)
+                identity = get_jwt_identity()
+            except Exception:
+                identity = None  # the view rejects the token itself
+            if identity is not None:
+                return f"user:{identity}"
+        return f"ip:{request.remote_addr}"
+
+    def _check(self):
+        if _exempt():
+            return None
+        limit = self.limits.get(request.endpoint, self.default_limit)
+        if limit is None:
+            return None
+        wait = self.backend.consume(f"{request.endpoint}:{self._client_key(limit.scope)}", limit.rate, limit.burst)
+        if wait > 0:
+            return _retry_response("Too many requests, please slow down", 429, wait)
+        return None
+
+class LoadShedder:
+    """Rejects requests with a 503 once too many are already in flight.
+
+    At most LOAD_SHED_MAX_IN_FLIGHT requests per process run at once;
+    beyond that new ones are turned away immediately (Retry-After:
+    LOAD_SHED_RETRY_AFTER) instead of queueing for a database connection,
+    so admitted requests keep their latency. Defaults to one less than the
+    worker's request thread count (GUNICORN_THREADS): a gunicorn worker
+    never runs more than that many requests, so the cap has to be below it
+    to ever trip. None disables shedding.
+    """
+
+    def __init__(self, app=None):
+        self.max_in_flight = None
+        self.retry_after = 1
+        self.in_flight = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("LOAD_SHED_MAX_IN_FLIGHT", max(1, worker_threads() - 1))
+        app.config.setdefault("LOAD_SHED_RETRY_AFTER", 1)
+        app.extensions["load_shedder"] = self
+        self.max_in_flight = app.config["LOAD_SHED_MAX_IN_FLIGHT"]
+        self.retry_after = app.config["LOAD_SHED_RETRY_AFTER"]
+        if self.max_in_flight is None:
+            return
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+
+    def _admit(self):
+        if _exempt():
+            return None
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                self.shed += 1
+                return _retry_response("Server is busy, please try again shortly", 503, self.retry_after)
+            self.in_flight += 1
+        g.load_shed_admitted = True
+        return None
+
+    def _release(self, exc):
+        # Runs when the request context ends, i.e. after a streamed body is sent
+        if g.pop("load_shed_admitted", False):
+            with self._lock:
+                self.in_flight -= 1
+
+rate_limiter = RateLimiter()
+load_shedder = LoadShedder()
@@ -0,0 +1,65 @@
+from collections import namedtuple
+
+from flask import jsonify
+from sqlalchemy import event, select
+
+from . import db, jwt
+from .cache import LRUCache
+from .models import User
+
+# Read-only snapshot of a User row; unlike an ORM instance it is not bound
+# to a session, so one copy can be shared by every request that needs it.
+CachedUser = namedtuple("CachedUser", ["id", "username", "email", "full_name", "role", "created_at"])
+
+class CachedUserLoader:
+    """Resolves the JWT identity to a CachedUser through a small TTL cache.
+
+    Registered as flask_jwt_extended's user lookup, so protected views use
+    `current_user` instead of issuing their own primary-key SELECT. Entries
+    are evicted whenever the ORM updates or deletes the user; USER_CACHE_TTL
+    bounds staleness for changes made elsewhere (other workers, raw SQL).
+    """
+
+    def __init__(self, app=None):
+        self.cache = LRUCache()
+        self.ttl = 30
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("USER_CACHE_TTL", 30)
+        app.config.setdefault("USER_CACHE_MAX_ENTRIES", 10000)
+        self.ttl = app.config["USER_CACHE_TTL"]
+        self.cache = LRUCache(app.config["USER_CACHE_MAX_ENTRIES"])
+        app.extensions["user_loader"] = self
+
+    def load(self, user_id):
+        user = self.cache.get(str(user_id))
+        if user is None:
+            row = db.session.execute(
+                select(User.id, User.username, User.email, User.full_name, User.role, User.created_at)
+                .where(User.id == user_id)
+            ).first()
+            if row is None:
+                return None
+            user = CachedUser(*row)
+            self.cache.set(str(user_id), user, self.ttl)
+        return user
+
+    def invalidate(self, user_id):
+        self.cache.delete(str(user_id))
+
+user_loader = CachedUserLoader()
+
+@jwt.user_lookup_loader
+def _load_user_from_jwt(jwt_header, jwt_data):
+    return user_loader.load(int(jwt_data["sub"]))
+
+@jwt.user_lookup_error_loader
+def _user_not_found(jwt_header, jwt_data):
+    return jsonify({"message": "User not found"}), 404
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(mapper, connection, target):
+    user_loader.invalidate(target.id)
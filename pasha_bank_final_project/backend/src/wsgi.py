@@ -0,0 +1,17 @@
+"""Entry point for production WSGI servers, e.g.
+
+    PASHA_ENV=production gunicorn -c gunicorn.conf.py
+
+src.main stays the target of the `flask` command and local runs.
+"""
+from src import create_app
+from src.prefork import prepare_preload
+
+class ServeConfig:
+    # The `flask db` commands aren't needed to serve requests
+    MIGRATIONS_ENABLED = False
+
+app = create_app(ServeConfig)
+
+if app.config["PRELOAD_WARMUP"]:
+    prepare_preload(app)
@@ -5,7 +5,6 @@ import { Link } from 'react-router-dom';
 interface Project {
   id: string;
   title: string;
-  description: string;
   image_url: string;
   current_amount: number;
   goal_amount: number;
@@ -23,8 +22,7 @@ const ProjectCard: React.FC<ProjectCardProps> = ({ project }) => {
     <div className="bg-white rounded-lg shadow-md overflow-hidden border border-gray-200 hover:shadow-xl transition-shadow duration-300 flex flex-col">
       <img src={project.image_url} alt={project.title} className="w-full h-48 object-cover" />
       <div className="p-6 flex flex-col flex-grow">
-        <h3 className="text-xl font-semibold text-pasha-red mb-2">{project.title}</h3>
-        <p className="text-gray-600 text-sm mb-4 line-clamp-3 flex-grow">{project.description}</p>
+        <h3 className="text-xl font-semibold text-pasha-red mb-4 flex-grow">{project.title}</h3>
         
         {/* Funding Progress */}
         <div className="mb-4">
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom'; // Import Link
-import { getMyInvestments } from '../services/apiService'; // Import API service
+import { getMyInvestments, getMyInvestmentSummary } from '../services/apiService'; // Import API service
 
 // Define Investment type (move to types file later)
 interface Investment {
@@ -12,8 +12,23 @@ interface Investment {
   invested_at: string;
 }
 
+interface PortfolioTotal {
+  count: number;
+  total: string;
+}
+
+interface PortfolioSummary {
+  total_invested: string;
+  investment_count: number;
+  project_count: number;
+  by_category: (PortfolioTotal & { category: string | null })[];
+  by_status: (PortfolioTotal & { status: string })[];
+  by_month: (PortfolioTotal & { month: string })[];
+}
+
 const DashboardPage: React.FC = () => {
   const [investments, setInvestments] = useState<Investment[]>([]);
+  const [summary, setSummary] = useState<PortfolioSummary | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   // const [projectsOwned, setProjectsOwned] = useState<any[]>([]); // For project owner later
@@ -31,7 +46,8 @@ const DashboardPage: React.FC = () => {
           return;
         }
 
-        const data = await getMyInvestments();
+        const [data, summaryData] = await Promise.all([getMyInvestments(), getMyInvestmentSummary()]);
+        setSummary(summaryData);
         // Convert amounts from string (API) to number
         const formattedData = data.map((inv: any) => ({
           ...inv,
@@ -69,6 +85,35 @@ const DashboardPage: React.FC = () => {
     <div className="bg-white rounded-lg shadow-lg p-6 md:p-10">
       <h1 className="text-3xl md:text-4xl font-bold text-pasha-red mb-8">My Dashboard</h1>
 
+      {/* Portfolio Summary (aggregated by the API) */}
+      {summary && summary.investment_count > 0 && (
+        <section className="mb-12">
+          <h2 className="text-2xl font-semibold text-gray-800 mb-4 border-b pb-2 border-pasha-green">Portfolio</h2>
+          <p className="text-gray-700 mb-4">
+            <span className="font-semibold text-pasha-green">${parseFloat(summary.total_invested).toLocaleString()}</span> invested in {summary.project_count} projects ({summary.investment_count} investments)
+          </p>
+          <div className="grid grid-cols-1 md:grid-cols-3 gap-6 text-sm">
+            {[
+              { title: 'By category', rows: summary.by_category.map(row => ({ label: row.category || 'N/A', ...row })) },
+              { title: 'By project status', rows: summary.by_status.map(row => ({ label: row.status, ...row })) },
+              { title: 'By month', rows: summary.by_month.map(row => ({ label: row.month, ...row })) },
+            ].map(group => (
+              <div key={group.title} className="bg-gray-50 p-4 rounded-lg border border-gray-200">
+                <h3 className="font-semibold text-gray-700 mb-2">{group.title}</h3>
+                <ul className="space-y-1 text-gray-600">
+                  {group.rows.map(row => (
+                    <li key={row.label} className="flex justify-between">
+                      <span>{row.label}</span>
+                      <span>${parseFloat(row.total).toLocaleString()}</span>
+                    </li>
+                  ))}
+                </ul>
+              </div>
+            ))}
+          </div>
+        </section>
+      )}
+
       {/* Investment Section */}
       <section className="mb-12">
         <h2 className="text-2xl font-semibold text-gray-800 mb-4 border-b pb-2 border-pasha-green">My Investments</h2>
@@ -8,16 +8,25 @@ import { getProjects } from '../services/apiService'; // Import API service
 interface Project {
   id: string;
   title: string;
-  description: string;
   image_url: string;
   current_amount: number;
   goal_amount: number;
-  // Add other fields matching the backend serialization
+  status: string;
+  // The list returns the summary view; add ?fields= to getProjects for more
 }
 
+// Convert amounts back to numbers if they are strings from API
+const formatProjects = (data: any[]): Project[] => data.map((p: any) => ({
+  ...p,
+  current_amount: parseFloat(p.current_amount),
+  goal_amount: parseFloat(p.goal_amount),
+}));
+
 const HomePage: React.FC = () => {
   const [projects, setProjects] = useState<Project[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
   useEffect(() => {
@@ -25,15 +34,10 @@ const HomePage: React.FC = () => {
       try {
         setLoading(true);
         setError(null);
-        // Fetch projects with 'funding' status by default
-        const data = await getProjects('funding'); 
-        // Convert amounts back to numbers if they are strings from API
-        const formattedData = data.map((p: any) => ({
-          ...p,
-          current_amount: parseFloat(p.current_amount),
-          goal_amount: parseFloat(p.goal_amount),
-        }));
-        setProjects(formattedData);
+        // Fetch the first page of projects with 'funding' status
+        const page = await getProjects('funding');
+        setProjects(formatProjects(page.projects));
+        setNextCursor(page.nextCursor);
       } catch (err) {
         console.error("Failed to fetch projects:", err);
         setError('Failed to load investment opportunities. Please try again later.');
@@ -45,6 +49,20 @@ const HomePage: React.FC = () => {
     fetchProjects();
   }, []); // Empty dependency array means this runs once on mount
 
+  const loadMoreProjects = async () => {
+    if (!nextCursor || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const page = await getProjects('funding', nextCursor);
+      setProjects(previous => [...previous, ...formatProjects(page.projects)]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error("Failed to fetch more projects:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   return (
     <div className="min-h-screen">
       {/* Hero Section */}
@@ -83,6 +101,18 @@ const HomePage: React.FC = () => {
             ))}
           </div>
         )}
+
+        {!loading && !error && nextCursor && (
+          <div className="text-center mt-10">
+            <button
+              onClick={loadMoreProjects}
+              disabled={loadingMore}
+              className="px-6 py-2 font-medium text-pasha-green border border-pasha-green rounded-lg hover:bg-green-50 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more projects'}
+            </button>
+          </div>
+        )}
       </main>
     </div>
   );
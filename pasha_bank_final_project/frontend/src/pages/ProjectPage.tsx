@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom'; // Removed unused Link import
-import { getProjectDetails, makeInvestment } from '../services/apiService'; // Import API service
+import { getProjectDetails, getProjectUpdates, makeInvestment } from '../services/apiService'; // Import API service
 
 // Define Project type (move to types file later)
 interface ProjectUpdate {
@@ -24,12 +24,13 @@ interface Project {
   owner_username: string;
   created_at: string;
   updated_at: string;
-  updates: ProjectUpdate[];
 }
 
 const ProjectPage: React.FC = () => {
   const { projectId } = useParams<{ projectId: string }>();
   const [project, setProject] = useState<Project | null>(null);
+  const [updates, setUpdates] = useState<ProjectUpdate[]>([]);
+  const [updatesCursor, setUpdatesCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [investmentAmount, setInvestmentAmount] = useState('');
@@ -42,7 +43,12 @@ const ProjectPage: React.FC = () => {
       try {
         setLoading(true);
         setError(null);
-        const data = await getProjectDetails(projectId);
+        const [data, firstUpdates] = await Promise.all([
+          getProjectDetails(projectId),
+          getProjectUpdates(projectId),
+        ]);
+        setUpdates(firstUpdates.updates);
+        setUpdatesCursor(firstUpdates.nextCursor);
         // Convert amounts from string (API) to number
         const formattedData = {
           ...data,
@@ -61,6 +67,17 @@ const ProjectPage: React.FC = () => {
     fetchDetails();
   }, [projectId]);
 
+  const loadMoreUpdates = async () => {
+    if (!projectId || !updatesCursor) return;
+    try {
+      const page = await getProjectUpdates(projectId, updatesCursor);
+      setUpdates(previous => [...previous, ...page.updates]);
+      setUpdatesCursor(page.nextCursor);
+    } catch (err) {
+      console.error(`Failed to fetch more updates for project ${projectId}:`, err);
+    }
+  };
+
   const handleInvestmentSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
     setInvestmentError(null);
@@ -139,17 +156,26 @@ const ProjectPage: React.FC = () => {
           </div>
 
           {/* Project Updates */}
-          {project.updates && project.updates.length > 0 && (
+          {updates.length > 0 && (
             <div className="mt-8">
               <h3 className="text-xl font-semibold text-gray-700 mb-3">Updates</h3>
               <div className="space-y-4">
-                {project.updates.map(update => (
+                {updates.map(update => (
                   <div key={update.id} className="bg-gray-100 p-4 rounded-lg border border-gray-200">
                     <p className="text-gray-800 text-sm">{update.update_text}</p>
                     <p className="text-xs text-gray-500 mt-1">{new Date(update.created_at).toLocaleString()}</p>
                   </div>
                 ))}
               </div>
+              {updatesCursor && (
+                <button
+                  type="button"
+                  onClick={loadMoreUpdates}
+                  className="mt-4 text-sm font-medium text-pasha-green hover:underline"
+                >
+                  Load older updates
+                </button>
+              )}
             </div>
           )}
         </div>
@@ -31,10 +31,11 @@ apiClient.interceptors.request.use(
 // API Service Functions
 
 // --- Projects --- 
-export const getProjects = async (status: string = 'funding') => {
+export const getProjects = async (status: string = 'funding', cursor?: string) => {
   try {
-    const response = await apiClient.get(`/projects?status=${status}`);
-    return response.data;
+    const response = await apiClient.get('/projects', { params: cursor ? { status, cursor } : { status } });
+    // One page at a time; the next page's cursor comes in a header, null on the last page
+    return { projects: response.data, nextCursor: response.headers['x-next-cursor'] || null };
   } catch (error) {
     console.error('Error fetching projects:', error);
     throw error; // Re-throw error to be handled by the component
@@ -43,7 +44,8 @@ export const getProjects = async (status: string = 'funding') => {
 
 export const getProjectDetails = async (projectId: string) => {
   try {
-    const response = await apiClient.get(`/projects/${projectId}`);
+    // Updates come from getProjectUpdates; an explicit view leaves them out of the details
+    const response = await apiClient.get(`/projects/${projectId}`, { params: { view: 'full' } });
     return response.data;
   } catch (error) {
     console.error(`Error fetching project ${projectId}:`, error);
@@ -51,6 +53,17 @@ export const getProjectDetails = async (projectId: string) => {
   }
 };
 
+export const getProjectUpdates = async (projectId: string, cursor?: string) => {
+  try {
+    const response = await apiClient.get(`/projects/${projectId}/updates`, { params: cursor ? { cursor } : {} });
+    // The next page's cursor comes in a header; null on the last page
+    return { updates: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+  } catch (error) {
+    console.error(`Error fetching updates for project ${projectId}:`, error);
+    throw error;
+  }
+};
+
 export const createProject = async (projectData: any) => {
   try {
     const response = await apiClient.post('/projects', projectData);
@@ -97,6 +110,28 @@ export const getCurrentUser = async () => {
   }
 };
 
+// Post an update to a project (owner or admin); investors are notified by e-mail
+export const postProjectUpdate = async (projectId: string, updateText: string) => {
+  try {
+    const response = await apiClient.post(`/projects/${projectId}/updates`, { update_text: updateText });
+    return response.data;
+  } catch (error) {
+    console.error(`Error posting update to project ${projectId}:`, error);
+    throw error;
+  }
+};
+
+// Funding over time (project owner or admin); bucket is 'hour' or 'day'
+export const getFundingTimeseries = async (projectId: string, bucket: 'hour' | 'day' = 'day', from?: string, to?: string) => {
+  try {
+    const response = await apiClient.get(`/projects/${projectId}/funding-timeseries`, { params: { bucket, from, to } });
+    return response.data;
+  } catch (error) {
+    console.error(`Error fetching funding timeseries for project ${projectId}:`, error);
+    throw error;
+  }
+};
+
 // --- Investments --- 
 export const makeInvestment = async (projectId: string, amount: number) => {
   try {
@@ -110,7 +145,8 @@ export const makeInvestment = async (projectId: string, amount: number) => {
 
 export const getMyInvestments = async () => {
   try {
-    const response = await apiClient.get('/investments/my');
+    // Full history, like getMyInvestmentSummary, so the table matches the totals
+    const response = await apiClient.get('/investments/my', { params: { history: 'full' } });
     return response.data;
   } catch (error) {
     console.error('Error fetching my investments:', error);
@@ -118,5 +154,16 @@ export const getMyInvestments = async () => {
   }
 };
 
+export const getMyInvestmentSummary = async () => {
+  try {
+    // Portfolio totals include investments in long-closed (archived) projects
+    const response = await apiClient.get('/investments/my/summary', { params: { history: 'full' } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching my investment summary:', error);
+    throw error;
+  }
+};
+
 export default apiClient;
 